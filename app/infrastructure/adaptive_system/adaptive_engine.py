@@ -8,6 +8,7 @@ from typing import Dict, List, Optional
 import numpy as np
 
 from sqlalchemy.exc import IntegrityError
+from ..cache import TTLCache
 from ..db.models import Question, UserResponse
 from .bandit import ContextualThompsonSampling
 from .irt import ThreePLIRT
@@ -20,20 +21,60 @@ from ..repositories.user_repository import UserRepository
 
 logger = logging.getLogger(__name__)
 
+# Short-lived cache of per-user ability / mastery reads shared across requests
+# in this process. Entries are refreshed on every write from this engine.
+_user_state_cache = TTLCache(maxsize=1024, ttl=2.0)
+
+
+class SessionNotFound(ValueError):
+    """The learning session does not exist."""
+
+
+class SessionAccessDenied(PermissionError):
+    """The learning session belongs to another user."""
+
 
 # ---------------------------
 # Domain Models
 # ---------------------------
 
+@dataclass(frozen=True)
+class ConceptMastery:
+    """
+    Per-user concept mastery as parallel arrays sorted by concept_id, so
+    lookups for many concepts at once are a single searchsorted.
+    """
+    concept_ids: np.ndarray  # int64, ascending
+    values: np.ndarray  # float64
+
+    def lookup(self, concept_ids, default: float) -> np.ndarray:
+        cids = np.asarray(concept_ids, dtype=np.int64)
+        if self.concept_ids.size == 0:
+            return np.full(cids.shape, default, dtype=np.float64)
+        pos = np.minimum(np.searchsorted(self.concept_ids, cids), self.concept_ids.size - 1)
+        found = self.concept_ids[pos] == cids
+        return np.where(found, self.values[pos], default)
+
+    def get(self, concept_id: int, default: float) -> float:
+        return float(self.lookup([concept_id], default)[0])
+
+
 @dataclass
 class UserState:
     user_id: int
     global_ability: float
     recent_accuracy: float
     response_time_avg: float
-    concept_mastery: Dict[int, float]
+    concept_mastery: ConceptMastery
     topic_id: int
 
+    def to_feature_vector(self) -> np.ndarray:
+        """[global_ability, recent_accuracy, response_time_avg] for the bandit."""
+        return np.array(
+            [self.global_ability, self.recent_accuracy, self.response_time_avg],
+            dtype=np.float64,
+        )
+
 
 # ---------------------------
 # Adaptive Engine
@@ -75,9 +116,9 @@ class AdaptiveLearningEngine:
         """
         Starts a new learning session.
         """
-        logger.info(f"Starting learning session for user_id={user_id}, subject_id={subject_id}, topic_id={topic_id}")
+        logger.info("Starting learning session for user_id=%s, subject_id=%s, topic_id=%s", user_id, subject_id, topic_id)
         session = self._sessions.create_session(user_id, subject_id, topic_id)
-        logger.info(f"Created session_id={session.session_id} for user_id={user_id}")
+        logger.info("Created session_id=%s for user_id=%s", session.session_id, user_id)
         return {
             "session_id": session.session_id,
             "subject_id": session.subject_id,
@@ -85,33 +126,66 @@ class AdaptiveLearningEngine:
             "start_time": session.start_time.isoformat()
         }
 
+    def get_session_topic(self, session_id: int, user_id: int) -> int:
+        """
+        Topic of a session owned by user_id. Ownership comes from the session
+        repository's cache, so this is usually free.
+        """
+        owner = self._sessions.get_session_owner(session_id)
+        if owner is None:
+            logger.warning("Session not found: session_id=%s", session_id)
+            raise SessionNotFound(f"Session {session_id} not found")
+
+        owner_id, topic_id = owner
+        if owner_id != user_id:
+            logger.warning(
+                "Session ownership mismatch: session_id=%s, session.user_id=%s, current_user_id=%s",
+                session_id,
+                owner_id,
+                user_id,
+            )
+            raise SessionAccessDenied("Session does not belong to current user")
+        return topic_id
+
+    def get_next_question_for_session(self, user_id: int, session_id: int) -> Dict:
+        """
+        Next question for a session owned by user_id, in its topic.
+        """
+        return self.get_next_question(user_id, self.get_session_topic(session_id, user_id))
+
     def get_next_question(self, user_id: int, topic_id: int) -> Dict:
         """
         Main adaptive loop: Select template → Generate/Fetch Question
         """
-        logger.info(f"Getting next question for user_id={user_id}, topic_id={topic_id}")
+        logger.info("Getting next question for user_id=%s, topic_id=%s", user_id, topic_id)
         
-        logger.debug(f"Building user state for user_id={user_id}")
+        logger.debug("Building user state for user_id=%s", user_id)
         user_state = self._build_user_state(user_id, topic_id)
-        logger.debug(f"User state built: ability={user_state.global_ability:.2f}, recent_accuracy={user_state.recent_accuracy:.2f}")
+        logger.debug("User state built: ability=%.2f, recent_accuracy=%.2f", user_state.global_ability, user_state.recent_accuracy)
 
         # 1. Selection
         templates = self._questions.get_candidate_templates(topic_id)
         if not templates:
-            logger.error(f"No templates found for topic_id={topic_id}")
+            logger.error("No templates found for topic_id=%s", topic_id)
             raise ValueError(f"No templates found for topic {topic_id}")
 
         # Personalization pre-filter:
         # restrict candidates to concepts in the learner's current ZPD
-        filtered_templates = self._filter_templates_for_user(templates, user_state)
-        logger.info(f"Filtered templates: {len(templates)} candidates → {len(filtered_templates)} after ZPD filtering")
+        filtered_templates, template_mastery = self._filter_templates_for_user(templates, user_state)
+        logger.info("Filtered templates: %d candidates → %d after ZPD filtering", len(templates), len(filtered_templates))
 
         selected_template = self._bandit.select_template(
             templates=filtered_templates,
-            user_context=user_state.__dict__,
+            user_features=user_state.to_feature_vector(),
             bandit_stats=self._responses.get_bandit_stats(user_id),
+            masteries=template_mastery,
+        )
+        logger.info(
+            "Selected template_id=%s, concept_id=%s, difficulty=%s",
+            selected_template.template_id,
+            selected_template.concept_id,
+            selected_template.target_difficulty,
         )
-        logger.info(f"Selected template_id={selected_template.template_id}, concept_id={selected_template.concept_id}, difficulty={selected_template.target_difficulty}")
 
         # 2. Generation / Retrieval (can be personalized using user_state)
         question_data = self._get_or_generate_question(selected_template, user_state)
@@ -119,7 +193,7 @@ class AdaptiveLearningEngine:
         # Try to find an active session
         active_session = self._sessions.get_active_session(user_id, topic_id)
         session_id = active_session.session_id if active_session else None
-        logger.info(f"Question ready: question_id={question_data.get('question_id')}, session_id={session_id}")
+        logger.info("Question ready: question_id=%s, session_id=%s", question_data.get("question_id"), session_id)
 
         return {
             "question_id": question_data.get("question_id"),
@@ -152,22 +226,30 @@ class AdaptiveLearningEngine:
         """
         Update system state after user response.
         """
-        logger.info(f"Processing response for user_id={user_id}, question_id={question_id}, session_id={session_id}")
-        
+        logger.info("Processing response for user_id=%s, question_id=%s, session_id=%s", user_id, question_id, session_id)
+
+        if session_id:
+            self.get_session_topic(session_id, user_id)
+
         question = self._get_question_model(question_id, template_id)
         if not question:
-            logger.error(f"Question not found: question_id={question_id}")
+            logger.error("Question not found: question_id=%s", question_id)
             raise ValueError(f"Question {question_id} not found")
 
         correct = selected_option_index == question.correct_option
-        logger.info(f"Response evaluated: correct={correct}, selected_option={selected_option_index}, correct_option={question.correct_option}")
+        logger.info(
+            "Response evaluated: correct=%s, selected_option=%s, correct_option=%s",
+            correct,
+            selected_option_index,
+            question.correct_option,
+        )
         
         # 1. Detect Misconceptions
         misconception = None
         if not correct:
             misconception = self._detect_misconception(template_id, selected_option_index)
             if misconception:
-                logger.info(f"Misconception detected: {misconception} for user_id={user_id}")
+                logger.info("Misconception detected: %s for user_id=%s", misconception, user_id)
 
         # 2. Store Response
         response_model = UserResponse(
@@ -183,7 +265,7 @@ class AdaptiveLearningEngine:
         )
         try:
             self._responses.store_response(response_model)
-            logger.debug(f"Response stored for user_id={user_id}, question_id={question_id}")
+            logger.debug("Response stored for user_id=%s, question_id=%s", user_id, question_id)
         except IntegrityError:
             # Handle duplicate submissions gracefully
             self._responses.db.rollback()
@@ -191,7 +273,7 @@ class AdaptiveLearningEngine:
             if existing:
                 # If it already exists, use the existing correctness for the rest of the flow
                 correct = existing.correct
-                logger.info(f"Duplicate response ignored for user_id={user_id}, question_id={question_id}")
+                logger.info("Duplicate response ignored for user_id=%s, question_id=%s", user_id, question_id)
             else:
                 # If for some reason we can't find it, re-raise
                 raise
@@ -199,12 +281,18 @@ class AdaptiveLearningEngine:
         # 3. Update Session Metrics
         if session_id:
             self._sessions.update_session_metrics(session_id, correct)
-            logger.debug(f"Session metrics updated for session_id={session_id}")
+            logger.debug("Session metrics updated for session_id=%s", session_id)
 
         # 4. Update Models
         new_theta = self._update_ability(user_id, question, correct)
         new_mastery = self._update_mastery(user_id, concept_id, correct)
-        logger.info(f"Models updated for user_id={user_id}: new_ability={new_theta:.3f}, new_mastery={new_mastery:.3f} (concept_id={concept_id})")
+        logger.info(
+            "Models updated for user_id=%s: new_ability=%.3f, new_mastery=%.3f (concept_id=%s)",
+            user_id,
+            new_theta,
+            new_mastery,
+            concept_id,
+        )
 
         
         # 5. Update Bandit
@@ -222,7 +310,7 @@ class AdaptiveLearningEngine:
             alpha=updated_bandit_params["alpha"],
             beta=updated_bandit_params["beta"]
         )
-        logger.debug(f"Bandit updated for template_id={template_id}, reward={reward:.3f}")
+        logger.debug("Bandit updated for template_id=%s, reward=%.3f", template_id, reward)
 
         return {
             "correct": correct,
@@ -234,17 +322,26 @@ class AdaptiveLearningEngine:
             "suggested_review": new_mastery < 0.7,
         }
 
-    def end_session(self, session_id: int) -> Dict:
+    def end_session(self, session_id: int, user_id: Optional[int] = None) -> Dict:
         """
-        Ends a learning session.
+        Ends a learning session. With user_id, only a session owned by that
+        user is ended; ownership is part of the same lookup.
         """
-        logger.info(f"Ending learning session: session_id={session_id}")
-        session = self._sessions.end_session(session_id)
+        logger.info("Ending learning session: session_id=%s", session_id)
+        session = self._sessions.end_session(session_id, user_id)
         if not session:
-            logger.error(f"Session not found: session_id={session_id}")
-            raise ValueError(f"Session {session_id} not found")
+            if user_id is not None:
+                # Nothing ended: tell a foreign session from a missing one
+                self.get_session_topic(session_id, user_id)
+            logger.error("Session not found: session_id=%s", session_id)
+            raise SessionNotFound(f"Session {session_id} not found")
         
-        logger.info(f"Session ended: session_id={session_id}, attempted={session.questions_attempted}, correct={session.questions_correct}")
+        logger.info(
+            "Session ended: session_id=%s, attempted=%s, correct=%s",
+            session_id,
+            session.questions_attempted,
+            session.questions_correct,
+        )
         return {
             "session_id": session.session_id,
             "subject_id": session.subject_id,
@@ -261,18 +358,40 @@ class AdaptiveLearningEngine:
 
     def _build_user_state(self, user_id: int, topic_id: int) -> UserState:
         recent = self._responses.get_recent_responses(user_id, limit=20)
-        accuracy = sum(r.correct for r in recent) / len(recent) if recent else 0.5
-        avg_time = np.mean([r.response_time for r in recent]) if recent else 30.0
+
+        # Single pass in plain Python; NumPy dispatch costs more than it saves on <=20 rows
+        n = len(recent)
+        if n:
+            correct_count = 0
+            time_sum = 0.0
+            for r in recent:
+                correct_count += r.correct
+                time_sum += r.response_time
+            accuracy = correct_count / n
+            avg_time = time_sum / n
+        else:
+            accuracy, avg_time = 0.5, 30.0
 
         return UserState(
             user_id=user_id,
-            global_ability=self._users.get_global_ability(user_id),
+            global_ability=self._get_global_ability(user_id),
             recent_accuracy=accuracy,
             response_time_avg=avg_time,
-            concept_mastery=self._users.get_concept_mastery(user_id),
+            concept_mastery=self._get_concept_mastery(user_id),
             topic_id=topic_id
         )
     
+    def _get_global_ability(self, user_id: int) -> float:
+        return _user_state_cache.get_or_set(
+            ("ability", user_id), lambda: self._users.get_global_ability(user_id)
+        )
+
+    def _get_concept_mastery(self, user_id: int) -> ConceptMastery:
+        return _user_state_cache.get_or_set(
+            ("mastery", user_id),
+            lambda: ConceptMastery(*self._users.get_concept_mastery(user_id)),
+        )
+
     def _filter_templates_for_user(
         self,
         templates,
@@ -290,43 +409,46 @@ class AdaptiveLearningEngine:
 
         If filtering would remove all templates, we fall back to the original list
         to avoid dead-ends and still allow the bandit to explore.
-        """
-        mastery_map = user_state.concept_mastery or {}
-        candidates = []
 
-        logger.info(f"Filtering {len(templates)} templates with ZPD range: [{min_mastery}, {max_mastery}]")
-        
-        for template in templates:
-            concept_id = getattr(template, "concept_id", None)
-            mastery = mastery_map.get(concept_id, 0.5)
-            
-            if min_mastery <= mastery <= max_mastery:
-                candidates.append(template)
-                logger.debug(
-                    f"✓ Included template_id={template.template_id}, concept_id={concept_id}, "
-                    f"mastery={mastery:.3f} (within ZPD)"
-                )
-            else:
-                logger.info(
-                    f"✗ Excluded template_id={template.template_id}, concept_id={concept_id}, "
-                    f"mastery={mastery:.3f} ({'too low' if mastery < min_mastery else 'already mastered'})"
-                )
+        Returns the kept templates and their mastery values, aligned.
+        """
+        # Templates without a concept get -1, which never matches, so they
+        # take the 0.5 default like any concept the user hasn't practised
+        concept_ids = np.fromiter(
+            (-1 if t.concept_id is None else t.concept_id for t in templates),
+            dtype=np.int64,
+            count=len(templates),
+        )
+        mastery_arr = user_state.concept_mastery.lookup(concept_ids, 0.5)
+        mask = (mastery_arr >= min_mastery) & (mastery_arr <= max_mastery)
+        candidates = [t for t, keep in zip(templates, mask) if keep]
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "ZPD filtering [%s, %s] kept %d out of %d templates (%d too low, %d already mastered)",
+                min_mastery,
+                max_mastery,
+                len(candidates),
+                len(templates),
+                int((mastery_arr < min_mastery).sum()),
+                int((mastery_arr > max_mastery).sum()),
+            )
 
         if not candidates:
             logger.warning(
-                f"ZPD filtering removed ALL templates! Falling back to original {len(templates)} templates. "
-                f"This likely means: (1) only 1 topic available, or (2) all concepts mastered/not-started"
+                "ZPD filtering removed ALL templates! Falling back to original %d templates. "
+                "This likely means: (1) only 1 topic available, or (2) all concepts mastered/not-started",
+                len(templates),
             )
-            return templates
-        
-        logger.info(f"ZPD filtering kept {len(candidates)} out of {len(templates)} templates")
-        return candidates
+            return templates, mastery_arr
+
+        return candidates, mastery_arr[mask]
 
     def _get_or_generate_question(self, template, user_state: Optional[UserState] = None) -> Dict:
         """
         Fetch from cache or call LLM
         """
-        logger.debug(f"Getting or generating question for template_id={template.template_id}")
+        logger.debug("Getting or generating question for template_id=%s", template.template_id)
         cached = None
         if user_state:
             cached = self._questions.get_unanswered_question(template.template_id, user_state.user_id)
@@ -334,7 +456,7 @@ class AdaptiveLearningEngine:
             cached = self._questions.get_cached_question(template.template_id)
 
         if cached:
-            logger.info(f"Using cached question_id={cached.question_id} for template_id={template.template_id}")
+            logger.info("Using cached question_id=%s for template_id=%s", cached.question_id, template.template_id)
             return {
                 "question_id": cached.question_id,
                 "question_text": cached.question_text,
@@ -347,15 +469,24 @@ class AdaptiveLearningEngine:
             logger.error("No question generator available and no cached questions")
             raise ValueError("No question generator available and no cached questions")
 
-        logger.info(f"Generating new question via LLM for template_id={template.template_id}, concept_id={template.concept_id}")
-        concept = self._questions.get_concept(template.concept_id)
+        logger.info(
+            "Generating new question via LLM for template_id=%s, concept_id=%s",
+            template.template_id,
+            template.concept_id,
+        )
+        # Candidate templates arrive with their concept attached (contains_eager)
+        concept = template.concept
         try:
             generated = self._question_gen.generate_question(
                 template=template,
                 concept=concept,
                 user_context=user_state.__dict__ if user_state is not None else None,
+                # Only reached once the learner has answered every stored
+                # question for this template; a similar-prompt hit would
+                # hand one of those back under a new id
+                reuse_similar=False,
             )
-            logger.info(f"LLM successfully generated question for template_id={template.template_id}")
+            logger.info("LLM successfully generated question for template_id=%s", template.template_id)
             
             # Persist a minimal Question record; IRT parameters are derived
             # from the template when updating ability.
@@ -367,7 +498,7 @@ class AdaptiveLearningEngine:
                 explanation=generated["explanation"],
             )
             saved = self._questions.save_question(new_q)
-            logger.info(f"Saved generated question_id={saved.question_id} to database")
+            logger.info("Saved generated question_id=%s to database", saved.question_id)
             return {
                 "question_id": saved.question_id,
                 "question_text": saved.question_text,
@@ -376,7 +507,12 @@ class AdaptiveLearningEngine:
                 "explanation": saved.explanation
             }
         except Exception as e:
-            logger.error(f"LLM question generation failed for template_id={template.template_id}: {e}", exc_info=True)
+            logger.error(
+                "LLM question generation failed for template_id=%s: %s",
+                template.template_id,
+                e,
+                exc_info=True,
+            )
             raise
 
     def _get_question_model(self, question_id: int, template_id: int) -> Optional[Question]:
@@ -395,8 +531,8 @@ class AdaptiveLearningEngine:
         return None
 
     def _update_ability(self, user_id: int, question: Question, correct: bool) -> float:
-        history = self._responses.get_irt_responses(user_id)
-        current_ability = self._users.get_global_ability(user_id)
+        correct_hist, difficulty_hist = self._responses.get_irt_arrays(user_id)
+        current_ability = self._get_global_ability(user_id)
 
         # Derive IRT-like item parameters from the template instead of
         # non-existent Question columns.
@@ -405,21 +541,20 @@ class AdaptiveLearningEngine:
         # Map difficulty from [0,1] → roughly [-3,3] for theta space
         irt_difficulty = (base_difficulty - 0.5) * 6.0
 
-        new_theta = self._irt.estimate_ability(
-            responses=history + [{
-                "correct": correct,
-                "difficulty": irt_difficulty,
-                "discrimination": 1.0,
-                "guessing": 0.25,
-            }],
+        new_theta = self._irt.estimate_ability_arrays(
+            correct=np.append(correct_hist, correct),
+            difficulty=np.append(difficulty_hist, irt_difficulty),
+            discrimination=1.0,
+            guessing=0.25,
             initial_theta=current_ability,
         )
 
         self._users.update_global_ability(user_id, new_theta)
+        _user_state_cache.set(("ability", user_id), new_theta)
         return new_theta
 
     def _update_mastery(self, user_id: int, concept_id: int, correct: bool) -> float:
-        masteries = self._users.get_concept_mastery(user_id)
+        masteries = self._get_concept_mastery(user_id)
         current = masteries.get(concept_id, 0.3)
         
         updated = self._kt.update_mastery(current, correct)
@@ -427,15 +562,19 @@ class AdaptiveLearningEngine:
 
         prereqs = self._users.get_prerequisites(concept_id)
         if prereqs:
-            prereq_masteries = {pid: masteries.get(pid, 0.5) for pid in prereqs}
+            prereq_masteries = dict(zip(prereqs, masteries.lookup(prereqs, 0.5).tolist()))
             updated_prereqs = self._kt.propagate_to_prerequisites(prereq_masteries, correct)
             for pid, m in updated_prereqs.items():
                 self._users.update_concept_mastery(user_id, pid, m)
 
+        _user_state_cache.invalidate(("mastery", user_id))
         return updated
 
     def _calculate_reward(self, correct: bool, response_time: float, difficulty: float) -> float:
-        base = 1.0 if correct else 0.0
-        optimal_time = (difficulty * 60) + 15
-        time_efficiency = max(0.0, 1.0 - abs(response_time - optimal_time) / optimal_time)
-        return float(np.clip(0.7 * base + 0.3 * time_efficiency, 0.0, 1.0))
+        # Plain float math; np.clip on a scalar costs more than the whole formula
+        optimal_time = difficulty * 60.0 + 15.0
+        time_efficiency = 1.0 - abs(response_time - optimal_time) / optimal_time
+        if time_efficiency < 0.0:
+            time_efficiency = 0.0
+        reward = 0.7 * (1.0 if correct else 0.0) + 0.3 * time_efficiency
+        return 0.0 if reward < 0.0 else 1.0 if reward > 1.0 else reward
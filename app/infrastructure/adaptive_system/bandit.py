@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional
 import numpy as np
 
 logger = logging.getLogger(__name__)
@@ -37,21 +37,20 @@ class ContextualThompsonSampling:
     def select_template(
         self,
         templates: List[any],  # List of Template objects
-        user_context: Dict,
+        user_features: np.ndarray,
         bandit_stats: Dict[int, Dict],
+        masteries: Optional[np.ndarray] = None,
     ) -> any:
         """
         Select the next template using Contextual Thompson Sampling.
 
         Args:
             templates: candidate templates (models.Template)
-            user_context: {
-                global_ability,
-                concept_mastery,
-                recent_accuracy,
-                avg_response_time
-            }
+            user_features: UserState.to_feature_vector(), i.e.
+                [global_ability, recent_accuracy, response_time_avg]
             bandit_stats: {template_id: {alpha, beta}}
+            masteries: concept mastery per template, aligned with templates
+                (defaults to 0.5 for all)
 
         Returns:
             Selected template object
@@ -60,27 +59,29 @@ class ContextualThompsonSampling:
         if not templates:
             raise ValueError("No templates available for selection")
 
-        scored_templates = []
+        n = len(templates)
+        if masteries is None:
+            masteries = np.full(n, 0.5)
 
-        for template in templates:
-            template_id = template.template_id
+        alphas = np.empty(n)
+        betas = np.empty(n)
+        target_diffs = np.empty(n)
+        for i, template in enumerate(templates):
+            stats = bandit_stats.get(template.template_id, {})
+            alphas[i] = stats.get("alpha", self.alpha_prior)
+            betas[i] = stats.get("beta", self.beta_prior)
+            target_diffs[i] = template.target_difficulty
 
-            stats = bandit_stats.get(template_id, {})
-            alpha = stats.get("alpha", self.alpha_prior)
-            beta = stats.get("beta", self.beta_prior)
+        # Thompson Sampling, all candidates in one draw
+        sampled_rewards = np.random.beta(alphas, betas)
 
-            # Thompson Sampling
-            sampled_reward = np.random.beta(alpha, beta)
+        # Context alignment score (0–1)
+        context_scores = self._context_scores(target_diffs, masteries, user_features)
 
-            # Context alignment score (0–1)
-            context_score = self._context_score(template, user_context)
+        # Final score
+        final_scores = sampled_rewards + self.context_weight * context_scores
 
-            # Final score
-            final_score = sampled_reward + self.context_weight * context_score
-
-            scored_templates.append((final_score, template))
-
-        selected = max(scored_templates, key=lambda x: x[0])[1]
+        selected = templates[int(np.argmax(final_scores))]
 
         logger.debug(
             "Bandit selected template=%s",
@@ -93,53 +94,42 @@ class ContextualThompsonSampling:
     # Context Scoring
     # -----------------------------------------------------
 
-    def _context_score(self, template: any, user_context: Dict) -> float:
+    def _context_scores(
+        self,
+        target_diffs: np.ndarray,
+        masteries: np.ndarray,
+        user_features: np.ndarray,
+    ) -> np.ndarray:
         """
-        Computes how well a template fits the user's current learning state.
+        Computes how well each template fits the user's current learning state.
 
-        Output range: [0, 1]
+        Output range: [0, 1] per template
         """
-
-        score = 0.0
-        weight_sum = 0.0
+        theta = float(user_features[0])  # ~[-3, 3]
+        recent_accuracy = float(user_features[1])
 
         # ---- Difficulty vs Ability (IRT-aware) ----
-        theta = user_context.get("global_ability", 0.0)  # ~[-3, 3]
-        target_diff = template.target_difficulty  # 0–1 scale
-
         # Map θ (range roughly -3 to 3) to 0-1 scale
-        normalized_theta = (theta + 3) / 6
-        normalized_theta = max(0.0, min(1.0, normalized_theta))
-        
-        diff_alignment = 1.0 - abs(target_diff - normalized_theta)
-
-        score += 0.4 * diff_alignment
-        weight_sum += 0.4
+        normalized_theta = max(0.0, min(1.0, (theta + 3) / 6))
+        diff_alignment = 1.0 - np.abs(target_diffs - normalized_theta)
 
         # ---- Concept Mastery (Zone of Proximal Development) ----
-        mastery_map = user_context.get("concept_mastery", {})
-        mastery = mastery_map.get(template.concept_id, 0.5)
-
-        mastery_alignment = 1.0 - abs(mastery - 0.7)  # peak at 70%
-        mastery_alignment = max(0.0, mastery_alignment)
+        mastery_alignment = np.maximum(0.0, 1.0 - np.abs(masteries - 0.7))  # peak at 70%
 
-        score += 0.4 * mastery_alignment
-        weight_sum += 0.4
+        score = 0.4 * diff_alignment + 0.4 * mastery_alignment
+        weight_sum = np.full_like(score, 0.8)
 
         # ---- Recent Accuracy Stabilization ----
-        recent_accuracy = user_context.get("recent_accuracy", 0.7)
-
-        if recent_accuracy < 0.3 and target_diff <= 0.4:
-            score += 0.2
-            weight_sum += 0.2
-        elif recent_accuracy > 0.9 and target_diff >= 0.7:
-            score += 0.2
-            weight_sum += 0.2
-
-        if weight_sum == 0:
-            return 0.0
-
-        return float(np.clip(score / weight_sum, 0.0, 1.0))
+        if recent_accuracy < 0.3:
+            bonus = target_diffs <= 0.4
+        elif recent_accuracy > 0.9:
+            bonus = target_diffs >= 0.7
+        else:
+            bonus = np.zeros_like(score, dtype=bool)
+        score += 0.2 * bonus
+        weight_sum += 0.2 * bonus
+
+        return np.clip(score / weight_sum, 0.0, 1.0)
 
     # -----------------------------------------------------
     # Parameter Update
@@ -1,13 +1,40 @@
+import atexit
 import logging
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 
+import requests
 from langchain_huggingface import HuggingFaceEndpoint, ChatHuggingFace
 from langchain_core.messages import SystemMessage, HumanMessage
 
+try:
+    from huggingface_hub import configure_http_backend
+except ImportError:  # removed in huggingface_hub 1.x, which pools via httpx itself
+    configure_http_backend = None
+
 from .llm_client import LLMClient
 
 logger = logging.getLogger(__name__)
 
+
+# huggingface_hub keeps one requests.Session per thread, so each worker
+# thread would otherwise hold its own connection pool and pay its own TLS
+# handshakes. Mounting a single adapter on every session makes them share
+# one thread-safe urllib3 pool.
+_SHARED_ADAPTER = requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=32)
+
+
+def _shared_session_factory() -> requests.Session:
+    session = requests.Session()
+    session.mount("https://", _SHARED_ADAPTER)
+    session.mount("http://", _SHARED_ADAPTER)
+    return session
+
+
+if configure_http_backend is not None:
+    configure_http_backend(backend_factory=_shared_session_factory)
+    atexit.register(_SHARED_ADAPTER.close)
+
+
 class HuggingFaceChatClient(LLMClient):
     def __init__(
         self,
@@ -18,6 +45,7 @@ class HuggingFaceChatClient(LLMClient):
         do_sample: bool = False,
         repetition_penalty: float = 1.03,
         timeout: int = 30,
+        max_batch_concurrency: int = 8,
         huggingfacehub_api_token: Optional[str] = None,
         base_url: Optional[str] = None,
     ):
@@ -37,6 +65,7 @@ class HuggingFaceChatClient(LLMClient):
 
         llm = HuggingFaceEndpoint(**endpoint_kwargs)
         self._chat = ChatHuggingFace(llm=llm)
+        self._max_batch_concurrency = max_batch_concurrency
 
     def generate(self, *, system_prompt: str, user_prompt: str) -> str:
         logger.debug("Generating via HuggingFace LLM")
@@ -47,7 +76,33 @@ class HuggingFaceChatClient(LLMClient):
         ]
 
         result = self._chat.invoke(messages)
-        print("*********************************************************************")
-        print(str(result.content))
-        print("*********************************************************************")
+        logger.debug("HF response: %s", result.content)
+        return str(result.content)
+
+    async def agenerate(self, *, system_prompt: str, user_prompt: str) -> str:
+        logger.debug("Generating via HuggingFace LLM (async)")
+
+        messages = [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt),
+        ]
+
+        # The endpoint keeps one async inference client, so pooled
+        # connections are reused for as long as this instance lives.
+        result = await self._chat.ainvoke(messages)
         return str(result.content)
+
+    def generate_batch(self, *, system_prompt: str, user_prompts: List[str]) -> List[str]:
+        logger.debug("Generating batch of %s via HuggingFace LLM", len(user_prompts))
+
+        system_message = SystemMessage(content=system_prompt)
+        batch = [
+            [system_message, HumanMessage(content=user_prompt)]
+            for user_prompt in user_prompts
+        ]
+
+        # Requests run concurrently over the endpoint client's pooled connections
+        results = self._chat.batch(
+            batch, config={"max_concurrency": self._max_batch_concurrency}
+        )
+        return [str(result.content) for result in results]
@@ -5,8 +5,51 @@ from scipy.stats import norm
 from typing import List, Dict, Tuple
 import logging
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to the NumPy implementation
+    njit = None
+
 logger = logging.getLogger(__name__)
 
+
+def _nll_and_grad_numpy(theta, correct, b, a, c):
+    """3PL negative log-likelihood and its derivative w.r.t. theta."""
+    sig = 1.0 / (1.0 + np.exp(-a * (theta - b)))
+    p = c + (1 - c) * sig
+    # Avoid log(0)
+    p = np.clip(p, 1e-10, 1 - 1e-10)
+    nll = -np.sum(np.where(correct, np.log(p), np.log(1 - p)))
+    # d/dθ of the log-likelihood: dp/dθ * (1/p or -1/(1-p))
+    dp = (1 - c) * a * sig * (1 - sig)
+    grad = -np.sum(np.where(correct, dp / p, -dp / (1 - p)))
+    return nll, grad
+
+
+def _nll_and_grad_loop(theta, correct, b, a, c):
+    """Same as _nll_and_grad_numpy as a single fused loop, for numba."""
+    nll = 0.0
+    grad = 0.0
+    for i in range(correct.shape[0]):
+        sig = 1.0 / (1.0 + np.exp(-a[i] * (theta - b[i])))
+        p = c[i] + (1 - c[i]) * sig
+        p = min(max(p, 1e-10), 1 - 1e-10)
+        dp = (1 - c[i]) * a[i] * sig * (1 - sig)
+        if correct[i]:
+            nll -= np.log(p)
+            grad -= dp / p
+        else:
+            nll -= np.log(1 - p)
+            grad += dp / (1 - p)
+    return nll, grad
+
+
+if njit is not None:
+    _nll_and_grad = njit(cache=True)(_nll_and_grad_loop)
+else:
+    _nll_and_grad = _nll_and_grad_numpy
+
+
 class ThreePLIRT:
     """3-Parameter Logistic Item Response Theory Model"""
     
@@ -33,28 +76,43 @@ class ThreePLIRT:
         if not responses:
             return initial_theta
 
+        return self.estimate_ability_arrays(
+            correct=np.fromiter((r['correct'] for r in responses), dtype=bool, count=len(responses)),
+            difficulty=np.fromiter((r['difficulty'] for r in responses), dtype=np.float64, count=len(responses)),
+            discrimination=np.fromiter((r.get('discrimination', 1.0) for r in responses), dtype=np.float64, count=len(responses)),
+            guessing=np.fromiter((r.get('guessing', 0.25) for r in responses), dtype=np.float64, count=len(responses)),
+            initial_theta=initial_theta,
+        )
+
+    def estimate_ability_arrays(
+        self,
+        correct: np.ndarray,
+        difficulty: np.ndarray,
+        discrimination=1.0,
+        guessing=0.25,
+        initial_theta: float = 0.0,
+    ) -> float:
+        """
+        Columnar MLE of ability: one array element per response.
+        discrimination / guessing may be arrays or scalars.
+        """
+        correct = np.asarray(correct, dtype=bool)
+        if correct.size == 0:
+            return initial_theta
+        b = np.asarray(difficulty, dtype=np.float64)
+        a = np.broadcast_to(np.asarray(discrimination, dtype=np.float64), b.shape)
+        c = np.broadcast_to(np.asarray(guessing, dtype=np.float64), b.shape)
+
         def negative_log_likelihood(theta):
-            ll = 0
-            for r in responses:
-                p = self.probability_correct(
-                    theta, 
-                    r['difficulty'], 
-                    r.get('discrimination', 1.0), 
-                    r.get('guessing', 0.25)
-                )
-                # Avoid log(0)
-                p = max(min(p, 1 - 1e-10), 1e-10)
-                if r['correct']:
-                    ll += np.log(p)
-                else:
-                    ll += np.log(1 - p)
-            return -ll
-        
+            nll, grad = _nll_and_grad(float(theta[0]), correct, b, a, c)
+            return nll, np.array([grad])
+
         # Constrained optimization
         try:
             result = minimize(
                 negative_log_likelihood,
-                initial_theta,
+                np.array([initial_theta], dtype=np.float64),
+                jac=True,
                 bounds=[(-4, 4)],  # Slightly wider bounds
                 method='L-BFGS-B'
             )
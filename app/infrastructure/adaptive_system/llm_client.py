@@ -1,4 +1,4 @@
-from typing import Protocol
+from typing import List, Protocol
 
 class LLMClient(Protocol):
     def generate(self, *, system_prompt: str, user_prompt: str) -> str:
@@ -6,3 +6,16 @@ class LLMClient(Protocol):
         Generates a response from the LLM based on system and user prompts.
         """
         ...
+
+    async def agenerate(self, *, system_prompt: str, user_prompt: str) -> str:
+        """
+        Async variant of generate, for use from the event loop.
+        """
+        ...
+
+    def generate_batch(self, *, system_prompt: str, user_prompts: List[str]) -> List[str]:
+        """
+        Generates one response per user prompt, sharing the system prompt.
+        Responses are returned in the same order as the prompts.
+        """
+        ...
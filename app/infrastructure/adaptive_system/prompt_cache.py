@@ -0,0 +1,106 @@
+# prompt_cache.py
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+
+def _default_embedder() -> Optional[Callable[[str], np.ndarray]]:
+    """
+    sentence-transformers embedder, loaded lazily on first use.
+    Returns None when sentence-transformers is not installed.
+    """
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        logger.info("sentence-transformers not installed; semantic prompt cache disabled")
+        return None
+
+    model = None
+    lock = threading.Lock()
+
+    def embed(text: str) -> np.ndarray:
+        nonlocal model
+        if model is None:
+            with lock:
+                if model is None:
+                    model = SentenceTransformer(EMBEDDING_MODEL)
+        return model.encode(text, normalize_embeddings=True)
+
+    return embed
+
+
+class SemanticPromptCache:
+    """
+    Caches parsed LLM questions by prompt embedding.
+
+    Entries live in namespaces (e.g. template/concept/tier) so only comparable
+    prompts can match. A lookup returns the stored result of the most similar
+    prompt in the namespace when cosine similarity >= threshold.
+    Brute-force inner product over normalized vectors (flat IP index).
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[Callable[[str], np.ndarray]] = None,
+        threshold: float = 0.87,
+        max_entries_per_namespace: int = 256,
+    ):
+        self._embed = embedder if embedder is not None else _default_embedder()
+        self.threshold = threshold
+        self.max_entries_per_namespace = max_entries_per_namespace
+        self._index: Dict[Hashable, Tuple[np.ndarray, List[Dict]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._embed is not None
+
+    def _vector(self, prompt: str) -> np.ndarray:
+        vec = np.asarray(self._embed(prompt), dtype=np.float32).ravel()
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def lookup(self, namespace: Hashable, prompt: str) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._index.get(namespace)
+        if entry is None:
+            return None
+
+        vectors, results = entry
+        scores = vectors @ self._vector(prompt)
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+
+        logger.debug("Semantic cache hit for %s (similarity=%.3f)", namespace, scores[best])
+        return results[best]
+
+    def add(self, namespace: Hashable, prompt: str, result: Dict) -> None:
+        if not self.enabled:
+            return
+        vec = self._vector(prompt)[np.newaxis, :]
+        with self._lock:
+            vectors, results = self._index.get(namespace, (None, []))
+            if vectors is None:
+                vectors = vec
+            else:
+                vectors = np.vstack((vectors, vec))
+            results = results + [result]
+            # Drop the oldest entries once the namespace is full
+            overflow = len(results) - self.max_entries_per_namespace
+            if overflow > 0:
+                vectors = vectors[overflow:]
+                results = results[overflow:]
+            self._index[namespace] = (vectors, results)
@@ -2,20 +2,158 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import logging
 import re
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
+try:
+    import orjson
+except ImportError:  # optional C parser; stdlib json is used without it
+    orjson = None
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
 
+try:
+    import requests
+except ImportError:
+    requests = None
+
+
+from ..cache import TTLCache
 from .llm_client import LLMClient
+from .prompt_cache import SemanticPromptCache
 
 
 logger = logging.getLogger(__name__)
 
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers keep
+# catching the stdlib exception either way.
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Network failures worth retrying. Validation and parse errors are
+# deterministic for a given response, so they are never retried.
+_TRANSIENT_LLM_ERRORS: tuple = (TimeoutError, ConnectionError)
+if httpx is not None:
+    _TRANSIENT_LLM_ERRORS += (httpx.HTTPError,)
+if requests is not None:
+    _TRANSIENT_LLM_ERRORS += (requests.RequestException,)
+
+_llm_retry = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=1, max=10),
+    retry=retry_if_exception_type(_TRANSIENT_LLM_ERRORS),
+    reraise=True,
+)
+
+# Exact-match cache of parsed questions keyed by the prompt inputs, including a
+# digest of the template/concept scaffold so edits change the key. Generation
+# is deterministic (do_sample=False), so identical prompts give identical output.
+_exact_prompt_cache = TTLCache(maxsize=4096, ttl=6 * 60 * 60)
+
+# Static prompt text shared by every generation request
+_PROMPT_HEADER = (
+    "You are an expert educational assessment designer. "
+    "Generate a high-quality multiple-choice question."
+)
+
+_PROMPT_FOOTER = """QUESTION REQUIREMENTS:
+✓ Write a clear, unambiguous question stem
+✓ #*IMPORTANT NOTE* : Create exactly 4 answer options (A, B, C, D)
+✓ ONE correct answer that aligns with correct reasoning criteria
+✓ THREE distractors that:
+  - Are plausible and tempting to students who have misconceptions
+  - Map to the misconception patterns listed above (when provided)
+  - Are similar in length and complexity to the correct answer
+  - Don't include "all of the above" or "none of the above"
+✓ Provide a detailed explanation that:
+  - Explains why the correct answer is right
+  - Addresses why each distractor is incorrect
+  - Connects to the underlying concept
+
+OUTPUT FORMAT (CRITICAL - must be valid JSON with EXACTLY this structure):
+{
+  "question_text": "Clear, specific question stem",
+  "options": [
+    "Option 1 text (do NOT include A), B), C), D) prefixes)",
+    "Option 2 text",
+    "Option 3 text",
+    "Option 4 text"
+  ],
+  "correct_option": 0,
+  "explanation": "Concise explanation (2-3 sentences max) covering why the correct answer is right. Keep it brief."
+}
+
+IMPORTANT: 
+- Do NOT add A), B), C), D) prefixes to options
+- Do NOT use nested objects for "explanation" - it MUST be a simple string
+- Do NOT use markdown bold (**text**) inside the JSON values
+- Keep explanation BRIEF (2-3 sentences maximum) - do NOT explain every distractor in detail"""
+
+# Static text between the template/concept fields in _build_static
+_PROMPT_PARTS = (
+    "\n\nCONCEPT INFORMATION:\nName: ",
+    "\nDescription: ",
+    "\n\nASSESSMENT OBJECTIVES:\nIntent: ",
+    "\nLearning Objective: ",
+    "\nTarget Difficulty: ",
+    " (0=easy, 1=hard)\nQuestion Style: ",
+    "\n\nCORRECT ANSWER CRITERIA:\n",
+    "\n\nCOMMON MISCONCEPTIONS TO ADDRESS:\n",
+    "\n\n",
+)
+
+# Prompt guidance per personalization tier
+_TIER_GUIDANCE = {
+    "BEGINNER": "Use simple language, direct questions, and obvious distractors. Avoid trick wording.",
+    "INTERMEDIATE": "Balance clarity with challenge. Include plausible but clearly incorrect distractors.",
+    "ADVANCED": "Use sophisticated scenarios, subtle distractors, and require multi-step reasoning.",
+}
+
+
+def _classify_tier(ability: float, accuracy: float) -> str:
+    """Map a student's ability and recent accuracy to a _TIER_GUIDANCE key."""
+    if ability < -1.0 or accuracy < 0.5:
+        return "BEGINNER"
+    if ability > 1.0 and accuracy > 0.8:
+        return "ADVANCED"
+    return "INTERMEDIATE"
+
+
+# Per (template_id, concept_id) static prompt scaffold and its digest. Template
+# and concept writes clear it locally; the short TTL covers other workers.
+_scaffold_cache = TTLCache(maxsize=2048, ttl=10 * 60)
+
+
+def invalidate_prompt_caches() -> None:
+    """Drop cached scaffolds and questions after a template or concept changes."""
+    _scaffold_cache.clear()
+    _exact_prompt_cache.clear()
+
+
+# "A)", "A:", "B)" ... prefixes the model sometimes adds to options
+_OPT_PREFIX_RE = re.compile(r'^[A-D][:\)]\s*')
+
+# JSON string literals, and the raw control chars that are invalid inside them
+_JSON_STRING_RE = re.compile(r'"(?:\\.|[^"\\])*"')
+_CTRL_CHAR_RE = re.compile(r'[\n\r\t]')
+_CTRL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+def _escape_control_chars(json_payload: str) -> str:
+    """Escape literal newlines/tabs inside JSON string values, leaving structure intact."""
+    def escape_literal(match: re.Match) -> str:
+        return _CTRL_CHAR_RE.sub(lambda c: _CTRL_ESCAPES[c.group(0)], match.group(0))
+
+    return _JSON_STRING_RE.sub(escape_literal, json_payload)
+
 
 # LLM Question Generator
 
@@ -26,39 +164,231 @@ class LLMQuestionGenerator:
 
     SYSTEM_PROMPT = "You are an expert educational content creator."
 
-    def __init__(self, llm_client: LLMClient):
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        prompt_cache: Optional[SemanticPromptCache] = None,
+    ):
         self._llm = llm_client
+        self._prompt_cache = prompt_cache
+        # Retry only the network call, so a retry never rebuilds the prompt
+        self._invoke_llm = _llm_retry(llm_client.generate)
+        self._ainvoke_llm = _llm_retry(llm_client.agenerate)
+        self._invoke_llm_batch = _llm_retry(llm_client.generate_batch)
 
     def generate_question(
         self,
         template: any,
         concept: any,
         user_context: Optional[Dict] = None,
+        reuse_similar: bool = True,
     ) -> Dict:
+        """
+        reuse_similar=False skips the semantic cache tier. Callers that need a
+        question the learner hasn't seen must pass it: a near-identical prompt
+        would return a question generated, and likely answered, before.
+        """
         logger.info(
-            f"Starting question generation for template_id={template.template_id}, "
-            f"concept_id={concept.concept_id}"
+            "Starting question generation for template_id=%s, concept_id=%s",
+            template.template_id,
+            concept.concept_id,
         )
         
+        cache_key = self._cache_key(template, concept, user_context)
+        cached = self._lookup_exact(cache_key)
+        if cached is not None:
+            return cached
+
+        prompt = self._build_prompt(template, concept, user_context=user_context)
+        logger.debug(
+            "Built prompt for template_id=%s, length=%s chars",
+            template.template_id,
+            len(prompt),
+        )
+
+        if reuse_similar:
+            cached = self._lookup_semantic(cache_key, prompt)
+            if cached is not None:
+                return cached
+
+        raw_output = self._invoke_llm(
+            system_prompt=self.SYSTEM_PROMPT,
+            user_prompt=prompt,
+        )
+        logger.debug("LLM response received, length=%s chars", len(raw_output))
+
+        result = self._parse_response(
+            raw_output=raw_output,
+            template=template,
+            concept=concept,
+        )
+        self._store_cached(cache_key, prompt, result)
+        return result
+
+    async def agenerate_question(
+        self,
+        template: any,
+        concept: any,
+        user_context: Optional[Dict] = None,
+        reuse_similar: bool = True,
+    ) -> Dict:
+        """
+        Async variant of generate_question. The LLM call is awaited on the
+        event loop; the semantic cache (which embeds the prompt) runs in a
+        worker thread so it doesn't block other requests.
+        """
+        logger.info(
+            "Starting async question generation for template_id=%s, concept_id=%s",
+            template.template_id,
+            concept.concept_id,
+        )
+
+        cache_key = self._cache_key(template, concept, user_context)
+        cached = self._lookup_exact(cache_key)
+        if cached is not None:
+            return cached
+
         prompt = self._build_prompt(template, concept, user_context=user_context)
-        logger.debug(f"Built prompt for template_id={template.template_id}, length={len(prompt)} chars")
+        if reuse_similar:
+            cached = await asyncio.to_thread(self._lookup_semantic, cache_key, prompt)
+            if cached is not None:
+                return cached
 
-        raw_output = self._llm.generate(
+        raw_output = await self._ainvoke_llm(
             system_prompt=self.SYSTEM_PROMPT,
             user_prompt=prompt,
         )
-        logger.debug(f"LLM response received, length={len(raw_output)} chars")
+        logger.debug("LLM response received, length=%s chars", len(raw_output))
 
-        return self._parse_response(
+        result = self._parse_response(
             raw_output=raw_output,
             template=template,
             concept=concept,
         )
+        await asyncio.to_thread(self._store_cached, cache_key, prompt, result)
+        return result
+
+    def generate_questions_batch(
+        self,
+        items: List[Tuple[any, any, Optional[Dict]]],
+        reuse_similar: bool = True,
+    ) -> List[Optional[Dict]]:
+        """
+        Generate one question per (template, concept, user_context) item.
+
+        Cache misses are sent to the LLM in a single batched call. Results are
+        returned in input order; an item whose response cannot be parsed is
+        logged and returned as None so it doesn't discard the rest of the batch.
+        reuse_similar behaves as in generate_question.
+        """
+        logger.info("Starting batch question generation for %s items", len(items))
+
+        results: List[Optional[Dict]] = [None] * len(items)
+        pending = []  # (index, cache_key, prompt)
+        for i, (template, concept, user_context) in enumerate(items):
+            cache_key = self._cache_key(template, concept, user_context)
+            cached = self._lookup_exact(cache_key)
+            if cached is None:
+                prompt = self._build_prompt(template, concept, user_context=user_context)
+                if reuse_similar:
+                    cached = self._lookup_semantic(cache_key, prompt)
+                if cached is None:
+                    pending.append((i, cache_key, prompt))
+            results[i] = cached
+
+        if not pending:
+            return results
+
+        raw_outputs = self._invoke_llm_batch(
+            system_prompt=self.SYSTEM_PROMPT,
+            user_prompts=[prompt for _, _, prompt in pending],
+        )
+        logger.debug("LLM batch response received for %s prompts", len(raw_outputs))
+
+        for (i, cache_key, prompt), raw_output in zip(pending, raw_outputs):
+            template, concept, _ = items[i]
+            try:
+                result = self._parse_response(
+                    raw_output=raw_output,
+                    template=template,
+                    concept=concept,
+                )
+            except Exception as exc:
+                logger.error(
+                    "Batch item %s failed for template_id=%s: %s",
+                    i,
+                    template.template_id,
+                    exc,
+                )
+                continue
+            self._store_cached(cache_key, prompt, result)
+            results[i] = result
+
+        return results
+
+    # ---------------------------
+    # Prompt Cache
+    # ---------------------------
+
+    def _cache_key(
+        self,
+        template: any,
+        concept: any,
+        user_context: Optional[Dict],
+    ) -> Tuple:
+        """
+        Exact-cache key built from the prompt inputs, at the precision the
+        prompt renders them, so a hit never has to build the full prompt.
+        The scaffold digest ties the key to the current template and concept
+        text. The first four fields are the semantic cache namespace.
+        """
+        _, digest = self._scaffold(template, concept)
+        key = (template.template_id, concept.concept_id, self._tier(user_context), digest)
+        if user_context:
+            key += (
+                round(user_context.get("global_ability", 0.0), 2),
+                round(user_context.get("recent_accuracy", 0.7), 2),
+                round(user_context.get("response_time_avg", 30.0), 1),
+            )
+        return key
+
+    @staticmethod
+    def _lookup_exact(cache_key: Tuple) -> Optional[Dict]:
+        cached = _exact_prompt_cache.get(cache_key)
+        if cached is None:
+            return None
+        logger.info("Exact prompt cache hit for template_id=%s", cache_key[0])
+        return {**cached, "options": list(cached["options"])}
+
+    def _lookup_semantic(self, cache_key: Tuple, prompt: str) -> Optional[Dict]:
+        if self._prompt_cache is None:
+            return None
+        # Only prompts for the same template and concept text and tier may share a result
+        cached = self._prompt_cache.lookup(cache_key[:4], prompt)
+        if cached is None:
+            return None
+        logger.info("Semantic cache hit for template_id=%s", cache_key[0])
+        return {**cached, "options": list(cached["options"])}
+
+    def _store_cached(self, cache_key: Tuple, prompt: str, result: Dict) -> None:
+        _exact_prompt_cache.set(cache_key, result)
+        if self._prompt_cache is not None:
+            self._prompt_cache.add(cache_key[:4], prompt, result)
 
     # ---------------------------
     # Prompt Construction
     # ---------------------------
 
+    @staticmethod
+    def _tier(user_context: Optional[Dict]) -> Optional[str]:
+        """Personalization tier used in the prompt, or None without user context."""
+        if not user_context:
+            return None
+        return _classify_tier(
+            user_context.get("global_ability", 0.0),
+            user_context.get("recent_accuracy", 0.7),
+        )
+
     def _build_prompt(
         self,
         template: any,
@@ -68,90 +398,62 @@ class LLMQuestionGenerator:
         """
         Build optimized LLM prompt for high-quality MCQ generation.
         """
-        # Build misconception list with clear formatting
-        misconceptions = template.misconception_patterns if template.misconception_patterns else []
-        misconceptions_text = "\n".join(f"{i+1}. {m}" for i, m in enumerate(misconceptions))
+        scaffold, _ = self._scaffold(template, concept)
 
-        # Build adaptive difficulty guidance
-        personalization_block = ""
+        # Dynamic content goes last so the static prefix stays identical
+        # across users of the same template.
+        sections = [scaffold]
         if user_context:
+            # Build adaptive difficulty guidance
             ability = user_context.get("global_ability", 0.0)
             recent_accuracy = user_context.get("recent_accuracy", 0.7)
             response_time_avg = user_context.get("response_time_avg", 30.0)
 
             # Determine difficulty tier
-            if ability < -1.0 or recent_accuracy < 0.5:
-                tier = "BEGINNER"
-                guidance = "Use simple language, direct questions, and obvious distractors. Avoid trick wording."
-            elif ability > 1.0 and recent_accuracy > 0.8:
-                tier = "ADVANCED"
-                guidance = "Use sophisticated scenarios, subtle distractors, and require multi-step reasoning."
-            else:
-                tier = "INTERMEDIATE"
-                guidance = "Balance clarity with challenge. Include plausible but clearly incorrect distractors."
-
-            personalization_block = f"""
-STUDENT ADAPTATION ({tier}):
-- Current ability: {ability:.2f} (range: -3 to +3)
-- Recent accuracy: {recent_accuracy:.0%}
-- Avg response time: {response_time_avg:.1f}s
-→ {guidance}
-"""
-
-        return f"""You are an expert educational assessment designer. Generate a high-quality multiple-choice question.
-
-CONCEPT INFORMATION:
-Name: {concept.name}
-Description: {concept.description}
-
-ASSESSMENT OBJECTIVES:
-Intent: {template.intent or "Test understanding of the concept"}
-Learning Objective: {template.learning_objective}
-Target Difficulty: {template.target_difficulty:.2f} (0=easy, 1=hard)
-Question Style: {template.question_style}
-
-CORRECT ANSWER CRITERIA:
-{template.correct_reasoning or "Student demonstrates accurate understanding of the concept"}
-
-COMMON MISCONCEPTIONS TO ADDRESS:
-{misconceptions_text if misconceptions_text else "None specified - create plausible distractors based on concept"}
-
-{personalization_block.strip()}
-
-QUESTION REQUIREMENTS:
-✓ Write a clear, unambiguous question stem
-✓ #*IMPORTANT NOTE* : Create exactly 4 answer options (A, B, C, D)
-✓ ONE correct answer that aligns with correct reasoning criteria
-✓ THREE distractors that:
-  - Are plausible and tempting to students who have misconceptions
-  - Map to the misconception patterns listed above (when provided)
-  - Are similar in length and complexity to the correct answer
-  - Don't include "all of the above" or "none of the above"
-✓ Provide a detailed explanation that:
-  - Explains why the correct answer is right
-  - Addresses why each distractor is incorrect
-  - Connects to the underlying concept
-
-OUTPUT FORMAT (CRITICAL - must be valid JSON with EXACTLY this structure):
-{{
-  "question_text": "Clear, specific question stem",
-  "options": [
-    "Option 1 text (do NOT include A), B), C), D) prefixes)",
-    "Option 2 text",
-    "Option 3 text",
-    "Option 4 text"
-  ],
-  "correct_option": 0,
-  "explanation": "Concise explanation (2-3 sentences max) covering why the correct answer is right. Keep it brief."
-}}
+            tier = _classify_tier(ability, recent_accuracy)
+            sections.append(
+                f"STUDENT ADAPTATION ({tier}):\n"
+                f"- Current ability: {ability:.2f} (range: -3 to +3)\n"
+                f"- Recent accuracy: {recent_accuracy:.0%}\n"
+                f"- Avg response time: {response_time_avg:.1f}s\n"
+                f"→ {_TIER_GUIDANCE[tier]}"
+            )
+        sections.append("Generate the question now:")
+
+        return "\n\n".join(sections)
+
+    @classmethod
+    def _scaffold(cls, template: any, concept: any) -> Tuple[str, bytes]:
+        """Cached static prompt sections and their digest."""
+        scaffold_key = (template.template_id, concept.concept_id)
+        entry = _scaffold_cache.get(scaffold_key)
+        if entry is None:
+            scaffold = cls._build_static(template, concept)
+            digest = hashlib.blake2b(scaffold.encode(), digest_size=16).digest()
+            entry = (scaffold, digest)
+            _scaffold_cache.set(scaffold_key, entry)
+        return entry
 
-IMPORTANT: 
-- Do NOT add A), B), C), D) prefixes to options
-- Do NOT use nested objects for "explanation" - it MUST be a simple string
-- Do NOT use markdown bold (**text**) inside the JSON values
-- Keep explanation BRIEF (2-3 sentences maximum) - do NOT explain every distractor in detail
+    @staticmethod
+    def _build_static(template: any, concept: any) -> str:
+        """Prompt sections that depend only on the template and concept."""
+        # Build misconception list with clear formatting
+        misconceptions = template.misconception_patterns if template.misconception_patterns else []
+        misconceptions_text = "\n".join(f"{i+1}. {m}" for i, m in enumerate(misconceptions))
 
-Generate the question now:""".strip()
+        p = _PROMPT_PARTS
+        return "".join((
+            _PROMPT_HEADER,
+            p[0], str(concept.name),
+            p[1], str(concept.description),
+            p[2], template.intent or "Test understanding of the concept",
+            p[3], str(template.learning_objective),
+            p[4], f"{template.target_difficulty:.2f}",
+            p[5], str(template.question_style),
+            p[6], template.correct_reasoning or "Student demonstrates accurate understanding of the concept",
+            p[7], misconceptions_text or "None specified - create plausible distractors based on concept",
+            p[8], _PROMPT_FOOTER,
+        ))
 
     # ---------------------------
     # Response Parsing & Validation
@@ -165,96 +467,69 @@ Generate the question now:""".strip()
         concept: any,
     ) -> Dict:
         try:
-            logger.debug(f"Extracting JSON from LLM response for template_id={template.template_id}")
+            logger.debug(
+                "Extracting JSON from LLM response for template_id=%s",
+                template.template_id,
+            )
             json_payload = self._extract_json(raw_output)
             
             # Log the extracted payload for debugging
             if not json_payload or not json_payload.strip():
                 logger.error(
-                    f"Extracted JSON payload is empty for template_id={template.template_id}",
-                    extra={"raw_output_preview": raw_output[:1000]}
+                    "Extracted JSON payload is empty for template_id=%s",
+                    template.template_id,
+                    extra={"raw_output_preview": raw_output[:1000]},
                 )
                 raise ValueError("Failed to extract valid JSON from LLM response - response may be incomplete")
             
-            logger.debug(f"Extracted JSON payload: {json_payload[:500]}...")
+            logger.debug("Extracted JSON payload: %s...", json_payload[:500])
             
             # Try to parse JSON - if it fails due to control characters, try escaping them
             try:
-                data = json.loads(json_payload)
+                data = _json_loads(json_payload)
             except json.JSONDecodeError as e:
                 if "control character" in str(e) or "Invalid" in str(e):
-                    logger.warning(f"JSON has control characters, attempting to escape them")
-                    # Escape control characters that might be in string values
-                    # This is a simple approach: replace literal newlines/tabs with escaped versions
-                    # We do this character by character to preserve JSON structure
-                    cleaned = []
-                    in_string = False
-                    escape_next = False
-                    
-                    for i, char in enumerate(json_payload):
-                        if escape_next:
-                            cleaned.append(char)
-                            escape_next = False
-                            continue
-                            
-                        if char == '\\':
-                            cleaned.append(char)
-                            escape_next = True
-                            continue
-                            
-                        if char == '"' and not escape_next:
-                            in_string = not in_string
-                            cleaned.append(char)
-                            continue
-                        
-                        # Only escape control chars when inside strings
-                        if in_string:
-                            if char == '\n':
-                                cleaned.append('\\n')
-                            elif char == '\r':
-                                cleaned.append('\\r')
-                            elif char == '\t':
-                                cleaned.append('\\t')
-                            else:
-                                cleaned.append(char)
-                        else:
-                            cleaned.append(char)
-                    
-                    json_payload = ''.join(cleaned)
-                    logger.debug(f"Cleaned JSON to escape control characters")
-                    data = json.loads(json_payload)
+                    logger.warning("JSON has control characters, attempting to escape them")
+                    # Escape literal newlines/tabs inside string values only,
+                    # so the JSON structure itself is preserved
+                    json_payload = _escape_control_chars(json_payload)
+                    logger.debug("Cleaned JSON to escape control characters")
+                    data = _json_loads(json_payload)
                 else:
                     # Log more details about the parsing error
                     logger.error(
-                        f"JSON parsing failed: {str(e)}",
+                        "JSON parsing failed: %s",
+                        e,
                         extra={
                             "error_type": type(e).__name__,
                             "json_preview": json_payload[:500]
-                        }
+                        },
                     )
                     raise
             
-            logger.debug(f"Successfully parsed JSON for template_id={template.template_id}")
+            logger.debug("Successfully parsed JSON for template_id=%s", template.template_id)
 
             self._validate_question_schema(data)
             logger.info(
-                f"Question validated successfully for template_id={template.template_id}, "
-                f"question length={len(data['question_text'])} chars"
+                "Question validated successfully for template_id=%s, question length=%s chars",
+                template.template_id,
+                len(data['question_text']),
             )
 
             # Clean options: remove A), B), C), D) prefixes and extra whitespace
-            cleaned_options = []
-            for opt in data["options"]:
-                # Remove prefixes like "A)", "A:", "B)", etc.
-                cleaned = re.sub(r'^[A-D][:\)]\s*', '', opt.strip())
-                cleaned_options.append(cleaned)
+            cleaned_options = [_OPT_PREFIX_RE.sub('', opt.strip()) for opt in data["options"]]
             
             # Handle explanation being an object (LLM sometimes ignores format)
             explanation = data["explanation"]
-            if isinstance(explanation, dict):
-                logger.warning(f"LLM returned complex explanation object, converting to string")
-                # Try to extract meaningful text from the object
-                explanation = str(explanation.get("correct_answer_rationale", {}).get("explanation_text", "")) or str(explanation)
+            if type(explanation) is not str:
+                match explanation:
+                    # Try to extract meaningful text from the object
+                    case {"correct_answer_rationale": {"explanation_text": text}} if text:
+                        logger.warning("LLM returned complex explanation object, converting to string")
+                        explanation = str(text)
+                    case dict():
+                        logger.warning("LLM returned complex explanation object, converting to string")
+                        explanation = str(explanation)
 
             return {
                 "question_text": data["question_text"],
@@ -267,13 +542,16 @@ Generate the question now:""".strip()
 
         except json.JSONDecodeError as exc:
             logger.error(
-                f"JSON parsing failed for template_id={template.template_id}: {exc}",
-                extra={"error": str(exc), "raw_output_preview": raw_output[:500]}
+                "JSON parsing failed for template_id=%s: %s",
+                template.template_id,
+                exc,
+                extra={"error": str(exc), "raw_output_preview": raw_output[:500]},
             )
             raise
         except Exception as exc:
             logger.warning(
-                f"Invalid LLM response format for template_id={template.template_id}",
+                "Invalid LLM response format for template_id=%s",
+                template.template_id,
                 extra={"error": str(exc), "raw_output_preview": raw_output[:500]},
             )
             raise
@@ -286,44 +564,46 @@ Generate the question now:""".strip()
         Many models (including reasoning models) may emit extra prose or
         <think>...</think> blocks around the JSON. We try, in order:
         - fenced ```json ... ``` blocks
-        - a raw JSON object covering the full string
-        - the first {...} span we can find
+        - the span from the first "{" to the last "}"
         
         After extraction, we clean markdown formatting (bold, italic)
         and escape control characters that some LLMs add inside JSON values.
         """
         json_text = ""
-        
-        if "```" in text:
-            # Handle ```json ... ``` or ``` ... ``` fences
-            parts = text.split("```")
-            # Take the first fenced block that looks like JSON
-            for part in parts[1:]:
-                cleaned = part.replace("json", "").strip()
-                if cleaned.startswith("{") and "}" in cleaned:
-                    json_text = cleaned
-                    break
 
-        if not json_text:
-            stripped = text.strip()
-            if stripped.startswith("{") and stripped.endswith("}"):
-                json_text = stripped
+        # Fenced blocks: scan fence to fence without splitting the whole text
+        fence = text.find("```")
+        while fence != -1 and not json_text:
+            start = fence + 3
+            fence = text.find("```", start)
+            end = fence if fence != -1 else len(text)
+            brace = text.find("{", start, end)
+            # Only an optional language tag may precede the object
+            if brace != -1 and text[start:brace].strip() in ("", "json"):
+                close = text.rfind("}", brace, end)
+                if close != -1:
+                    json_text = text[brace : close + 1]
 
         if not json_text:
-            # Fallback: grab the first {...} span
-            start = text.strip().find("{")
-            end = text.strip().rfind("}")
-            if start != -1 and end != -1 and end > start:
-                json_text = text.strip()[start : end + 1]
+            # Raw object, possibly wrapped in prose: first "{" to last "}"
+            start = text.find("{")
+            end = text.rfind("}")
+            if start != -1 and end > start:
+                json_text = text[start : end + 1]
 
         if not json_text:
             json_text = text.strip()
         
         # Clean markdown formatting from JSON values
         # Remove bold markers: **text** -> text
-        json_text = json_text.replace("**", "")
+        if "**" in json_text:
+            json_text = json_text.replace("**", "")
         
-        logger.debug(f"Cleaned JSON length: {len(json_text)} chars, first 300: {json_text[:300]}")
+        logger.debug(
+            "Cleaned JSON length: %s chars, first 300: %s",
+            len(json_text),
+            json_text[:300],
+        )
         
         return json_text
 
@@ -333,14 +613,14 @@ Generate the question now:""".strip()
 
         if not required_keys.issubset(data):
             missing = required_keys - set(data.keys())
-            logger.error(f"Missing required keys in generated question: {missing}")
+            logger.error("Missing required keys in generated question: %s", missing)
             raise ValueError(f"Missing required keys: {missing}")
 
         if not isinstance(data["options"], list) or len(data["options"]) != 4:
-            logger.error(f"Invalid options count: expected 4, got {len(data.get('options', []))}")
+            logger.error("Invalid options count: expected 4, got %s", len(data.get('options', [])))
             raise ValueError("Exactly 4 options required")
 
         if not isinstance(data["correct_option"], int) or not 0 <= data["correct_option"] <= 3:
-            logger.error(f"Invalid correct_option: {data.get('correct_option')}")
+            logger.error("Invalid correct_option: %s", data.get('correct_option'))
             raise ValueError("correct_option must be between 0 and 3")
 
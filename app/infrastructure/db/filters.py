@@ -0,0 +1,24 @@
+from typing import Collection
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql.elements import ColumnElement
+
+# Above this many values, IN (...) lists are sent as one array parameter
+IN_LIST_THRESHOLD = 60
+
+
+def in_values(column, values: Collection) -> ColumnElement[bool]:
+    """
+    `column IN values` that stays cheap for long lists.
+
+    Short lists use a plain IN. Longer ones become
+    `column IN (SELECT unnest(:values))`: a single array bind instead of one
+    parameter per value, so the statement text (and its cached plan) doesn't
+    change with the list length and Postgres plans it as a semi-join against
+    the column's index.
+    """
+    if len(values) < IN_LIST_THRESHOLD:
+        return column.in_(values)
+    array = literal(list(values), ARRAY(column.type))
+    return column.in_(select(func.unnest(array)))
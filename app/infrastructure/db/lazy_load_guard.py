@@ -0,0 +1,48 @@
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, sessionmaker
+
+logger = logging.getLogger(__name__)
+
+_SEEN_KEY = "lazy_load_guard.seen"
+_REPORTED_KEY = "lazy_load_guard.reported"
+
+
+class NPlusOneError(RuntimeError):
+    """Raised in strict mode when a relationship is lazy-loaded per row."""
+
+
+def install(session_factory: sessionmaker, raise_: bool = False) -> None:
+    """
+    Dev-only N+1 detector. Watches every ORM execute on sessions from
+    `session_factory`, and reports when the same relationship is
+    lazy-loaded for a second instance within one session (one request),
+    i.e. a loop over rows is issuing a query per row.
+
+    Logs at ERROR by default; with raise_=True the load fails with
+    NPlusOneError so the offending endpoint shows up in tests and in dev.
+    """
+
+    @event.listens_for(session_factory, "do_orm_execute")
+    def _check_lazy_load(state: ORMExecuteState) -> None:
+        parent = state.lazy_loaded_from
+        if parent is None:
+            return
+
+        path = state.loader_strategy_path
+        attr = str(path[-1]) if path else parent.class_.__name__
+        info = state.session.info
+        seen = info.setdefault(_SEEN_KEY, {}).setdefault(attr, set())
+        seen.add(parent.identity_key)
+        if len(seen) < 2 or attr in info.setdefault(_REPORTED_KEY, set()):
+            return
+
+        info[_REPORTED_KEY].add(attr)
+        message = (
+            f"Potential N+1: {attr} lazy-loaded for multiple instances; "
+            f"eager-load it (selectinload/joinedload) in the query"
+        )
+        logger.error(message)
+        if raise_:
+            raise NPlusOneError(message)
@@ -20,6 +20,12 @@ from .user_mastery_model import UserMastery
 from .user_model import UserModel
 from .user_response_model import UserResponse
 
+from sqlalchemy.orm import configure_mappers
+
+# Every model is imported above, so resolve all relationships now instead of
+# inside the first request that touches the ORM.
+configure_mappers()
+
 
 __all__ = [
     "AttemptModel",
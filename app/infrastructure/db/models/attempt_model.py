@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Boolean, String
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey, DateTime, Boolean, String, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..base import Base
@@ -23,7 +23,7 @@ from ..base import Base
 class AttemptModel(Base):
     __tablename__ = "attempts"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigInteger, primary_key=True)
 
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
@@ -46,3 +46,17 @@ class AttemptModel(Base):
     mcq = relationship("PracticeMCQ", back_populates="attempts")
     selected_option = relationship("OptionModel")
     practice_session = relationship("PracticeSessionModel", back_populates="attempts")
+
+    __table_args__ = (
+        Index("ix_attempts_user_mode_time", "user_id", "mode", "attempted_at"),
+        Index("ix_attempts_user_mcq", "user_id", "mcq_id"),
+        Index("ix_attempts_mcq_correct", "mcq_id", "is_correct"),
+        Index("ix_attempts_session_user", "practice_session_id", "user_id"),
+        # "My wrong answers": only the incorrect rows are indexed
+        Index(
+            "ix_attempts_wrong",
+            "user_id",
+            "mcq_id",
+            postgresql_where=text("is_correct = false"),
+        ),
+    )
@@ -11,7 +11,7 @@ from sqlalchemy import UniqueConstraint
 class BanditStats(Base):
     __tablename__ = "bandit_stats"
     
-    bandit_id = Column(Integer, primary_key=True, index=True)
+    bandit_id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id",ondelete="CASCADE"))
     template_id = Column(Integer, ForeignKey("templates.template_id"))
     alpha = Column(Float, default=1.0)
@@ -1,17 +1,18 @@
 
-from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from ..base import Base
-from datetime import datetime
 
 class LearningSession(Base):
     __tablename__ = "learning_sessions"
     
-    session_id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(BigInteger, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id",ondelete="CASCADE"))
     subject_id = Column(Integer, ForeignKey("practice_subjects.id"))
     topic_id = Column(Integer, ForeignKey("topics.id"))
-    start_time = Column(DateTime, default=datetime.utcnow)
+    # UTC, matching the naive utcnow() used for end_time
+    start_time = Column(DateTime, server_default=func.timezone("utc", func.now()))
     end_time = Column(DateTime)
     questions_attempted = Column(Integer, default=0)
     questions_correct = Column(Integer, default=0)
@@ -1,26 +1,27 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Text,Enum, String, Boolean, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Text, String, Boolean, Index, select, text
+from sqlalchemy.orm import column_property, relationship
 from sqlalchemy.sql import func
 from ..base import Base
 from .mock_test_model import mock_test_mcq_association
-import enum
 
 class PracticeMCQ(Base):
     __tablename__ = "practice_mcqs"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     question_text = Column(Text, nullable=False)
     explanation = Column(Text, nullable=True)
     difficulty = Column(String, nullable=True,default="medium")
+    # Indexed: MCQs are listed and counted per topic
     topic_id = Column(
-        Integer, ForeignKey("topics.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("topics.id", ondelete="CASCADE"), nullable=False, index=True
     )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     topic = relationship("Topic", back_populates="mcqs")
+    # Options are read with every MCQ; load them for all parents in one IN query
     options = relationship(
-        "OptionModel", back_populates="mcq", cascade="all, delete-orphan"
+        "OptionModel", back_populates="mcq", cascade="all, delete-orphan", lazy="selectin"
     )
     attempts = relationship("AttemptModel", back_populates="mcq")
     
@@ -34,7 +35,7 @@ class PracticeMCQ(Base):
 class OptionModel(Base):
     __tablename__ = "options"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     mcq_id = Column(
         Integer, ForeignKey("practice_mcqs.id", ondelete="CASCADE"), nullable=False
     )
@@ -44,11 +45,16 @@ class OptionModel(Base):
     # Relationship
     mcq = relationship("PracticeMCQ", back_populates="options")
 
+    __table_args__ = (
+        # Correct-option lookups; one row in four, so index only those
+        Index("ix_options_correct", "mcq_id", postgresql_where=text("is_correct")),
+    )
+
 
 class MockTestMCQ(Base):
     __tablename__ = "mock_test_mcqs"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     question_text = Column(Text, nullable=False)
     subject_id = Column(
         Integer, ForeignKey("mock_test_subjects.id", ondelete="CASCADE")
@@ -60,15 +66,16 @@ class MockTestMCQ(Base):
     mock_tests = relationship(
         "MockTestModel", secondary=mock_test_mcq_association, back_populates="questions"
     )
+    # Options are read with every MCQ; load them for all parents in one IN query
     options = relationship(
-        "MockTestOption", back_populates="mcq", cascade="all, delete-orphan"
+        "MockTestOption", back_populates="mcq", cascade="all, delete-orphan", lazy="selectin"
     )
 
 
 class MockTestOption(Base):
     __tablename__ = "mock_test_options"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     mcq_id = Column(
         Integer, ForeignKey("mock_test_mcqs.id", ondelete="CASCADE"), nullable=False
     )
@@ -76,3 +83,19 @@ class MockTestOption(Base):
     is_correct = Column(Boolean, default=False, nullable=False)
 
     mcq = relationship("MockTestMCQ", back_populates="options")
+
+    __table_args__ = (
+        Index("ix_mock_test_options_correct", "mcq_id", postgresql_where=text("is_correct")),
+    )
+
+
+# Id of the MCQ's correct option, answered from ix_mock_test_options_correct.
+# Deferred: only queries that undefer() it pay for the subquery.
+MockTestMCQ.correct_option_id = column_property(
+    select(MockTestOption.id)
+    .where(MockTestOption.mcq_id == MockTestMCQ.id, MockTestOption.is_correct)
+    .limit(1)
+    .correlate_except(MockTestOption)
+    .scalar_subquery(),
+    deferred=True,
+)
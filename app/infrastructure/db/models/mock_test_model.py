@@ -26,7 +26,7 @@ mock_test_mcq_association = Table(
 class MockTestModel(Base):
     __tablename__ = "mock_tests"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -9,7 +9,7 @@ from ..base import Base
 class MockTestSessionModel(Base):
     __tablename__ = "mock_test_sessions"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
 
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     mock_test_id = Column(Integer, ForeignKey("mock_tests.id", ondelete="CASCADE"), nullable=False)
@@ -82,7 +82,7 @@ class MockTestSessionQuestionModel(Base):
 class MockTestSessionAnswerModel(Base):
     __tablename__ = "mock_test_session_answers"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
 
     session_id = Column(
         Integer,
@@ -14,7 +14,7 @@ from ..base import Base
 class Note(Base):
     __tablename__ = "notes"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     topic_id = Column(
         Integer, ForeignKey("topics.id", ondelete="CASCADE"), nullable=False
     )
@@ -7,7 +7,7 @@ from ..base import Base
 class PracticeSessionModel(Base):
     __tablename__ = "practice_sessions"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
 
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     topic_id = Column(Integer, ForeignKey("topics.id"), nullable=False)
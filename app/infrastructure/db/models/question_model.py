@@ -1,5 +1,6 @@
 
 from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Float
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from ..base import Base
 from datetime import datetime
@@ -10,10 +11,10 @@ from datetime import datetime
 class Question(Base):
     __tablename__ = "questions"
     
-    question_id = Column(Integer, primary_key=True, index=True)
-    template_id = Column(Integer, ForeignKey("templates.template_id", ondelete="CASCADE"))
+    question_id = Column(Integer, primary_key=True)
+    template_id = Column(Integer, ForeignKey("templates.template_id", ondelete="CASCADE"), index=True)
     question_text = Column(Text, nullable=False)
-    options = Column(JSON)  # list of MCQ options
+    options = Column(JSONB)  # list of MCQ options
     correct_option = Column(Integer)  # index of correct option
     explanation = Column(Text)
 
@@ -15,7 +15,7 @@ from ..base import Base
 class PracticeSubject(Base):
     __tablename__ = "practice_subjects"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False, unique=True)
     description = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -31,7 +31,7 @@ class PracticeSubject(Base):
 class MockTestSubject(Base):
     __tablename__ = "mock_test_subjects"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
     mock_test_id = Column(
         Integer, ForeignKey("mock_tests.id", ondelete="CASCADE"), nullable=False
@@ -1,5 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Float, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Float, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.sql import func
 from ..base import Base
 from datetime import datetime
 
@@ -44,15 +46,19 @@ class Template(Base):
     question_style = Column(String(50))  # conceptual / numerical / cause-effect
     target_difficulty = Column(Float, default=0.5)
 
+    # Generation content, deferred as one "content" group: candidate lists and
+    # template relationship loads don't read it, and the first access loads
+    # all three together. Detail/list endpoints undefer_group("content").
+
     # Correctness logic (not literal answer)
-    correct_reasoning = Column(Text)
+    correct_reasoning = deferred(Column(Text), group="content")
 
     # Misconception patterns used for distractors
-    misconception_patterns = Column(JSON)  
+    misconception_patterns = deferred(Column(JSONB), group="content")
     # Example:
     # ["force_needed_for_motion", "confuse_velocity_acceleration", "ignores_inertia"]
 
-    answer_format = Column(String(20), default="MCQ")
+    answer_format = deferred(Column(String(20), default="MCQ"), group="content")
 
     # NOTE:
     # IRT item parameters (difficulty / discrimination / guessing)
@@ -60,7 +66,7 @@ class Template(Base):
     # Columns were removed here to stay in sync with the existing DB
     # schema and avoid selecting non-existent fields.
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.timezone("utc", func.now()))
 
     concept = relationship("Concept", back_populates="templates")
 
@@ -77,3 +83,12 @@ class Template(Base):
         cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # Containment lookups, e.g. misconception_patterns @> '["ignores_inertia"]'
+        Index(
+            "ix_templates_misconceptions_gin",
+            "misconception_patterns",
+            postgresql_using="gin",
+        ),
+    )
+
@@ -6,7 +6,7 @@ from sqlalchemy import UniqueConstraint
 class Topic(Base):
     __tablename__ = "topics"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
     subject_id = Column(
         Integer, ForeignKey("practice_subjects.id", ondelete="CASCADE"), nullable=False
@@ -35,4 +35,5 @@ class Topic(Base):
 
     __table_args__ = (
         UniqueConstraint("order_index", "subject_id", name="uq_topic_order_subject_id"),
+        UniqueConstraint("name", "subject_id", name="uq_topic_name_subject_id"),
     )
@@ -10,7 +10,7 @@ from sqlalchemy import UniqueConstraint
 class UserAbility(Base):
     __tablename__ = "user_abilities"
     
-    ability_id = Column(Integer, primary_key=True, index=True)
+    ability_id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id",ondelete="CASCADE"))
     global_ability = Column(Float, default=0.5)  # IRT θ
     last_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -11,7 +11,7 @@ from sqlalchemy import UniqueConstraint
 class UserMastery(Base):
     __tablename__ = "user_mastery"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id",ondelete="CASCADE"))
     concept_id = Column(Integer, ForeignKey("concepts.concept_id"))
     mastery = Column(Float, default=0.0)  # 0-1
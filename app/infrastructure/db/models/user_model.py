@@ -9,9 +9,10 @@ from sqlalchemy import UniqueConstraint
 class UserModel(Base):
     __tablename__ = "users"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
-    email = Column(String, unique=True, nullable=False, index=True)
+    # Uniqueness (and the lookup index) comes from uq_email_user below
+    email = Column(String, nullable=False)
     password_hash = Column(String, nullable=False)
     role = Column(String, nullable=False)  # "ADMIN" or "USER"
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -19,7 +20,8 @@ class UserModel(Base):
 
     # Relationships
     abilities = relationship("UserAbility", back_populates="user", cascade="all, delete-orphan",passive_deletes=True)
-    responses = relationship("UserResponse", back_populates="user", cascade="all, delete-orphan",passive_deletes=True)
+    # Unbounded history; query UserResponse directly instead of loading it here
+    responses = relationship("UserResponse", back_populates="user", cascade="all, delete-orphan",passive_deletes=True, lazy="raise_on_sql")
     masteries = relationship("UserMastery", back_populates="user",cascade="all, delete-orphan",passive_deletes=True)
     bandit_stats = relationship("BanditStats", back_populates="user",cascade="all, delete-orphan",passive_deletes=True)
     sessions = relationship("LearningSession", back_populates="user",cascade="all, delete-orphan",passive_deletes=True)
@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Boolean, String, UniqueConstraint
+from sqlalchemy import Column, Integer, BigInteger, Float, DateTime, ForeignKey, Boolean, String, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from ..base import Base
 from datetime import datetime
@@ -12,9 +12,9 @@ from sqlalchemy import UniqueConstraint
 class UserResponse(Base):
     __tablename__ = "user_responses"
     
-    response_id = Column(Integer, primary_key=True, index=True)
+    response_id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id",ondelete="CASCADE"))
-    session_id = Column(Integer, ForeignKey("learning_sessions.session_id"))
+    session_id = Column(BigInteger, ForeignKey("learning_sessions.session_id"))
     question_id = Column(Integer, ForeignKey("questions.question_id"))
     template_id = Column(Integer, ForeignKey("templates.template_id"))
     concept_id = Column(Integer, ForeignKey("concepts.concept_id"))
@@ -32,4 +32,6 @@ class UserResponse(Base):
 
     __table_args__ = (
         UniqueConstraint("user_id", "question_id", name="uq_user_question_response"),
+        # Recent-history reads: WHERE user_id = ? ORDER BY timestamp DESC LIMIT n
+        Index("ix_user_responses_user_time", user_id, timestamp.desc()),
     )
@@ -1,8 +1,11 @@
+from contextvars import ContextVar
+from typing import Optional
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import scoped_session, sessionmaker
 import os
 from dotenv import load_dotenv
 from .base import Base
+from . import lazy_load_guard
 
 load_dotenv() 
 
@@ -14,6 +17,26 @@ DB_NAME = os.getenv("POSTGRES_DB")
 
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(DATABASE_URL, echo=True) 
+engine = create_engine(
+    DATABASE_URL,
+    echo=True,
+    insertmanyvalues_page_size=10_000,
+    # Room for every distinct statement shape the app issues, so hot
+    # queries are never evicted from the compiled-SQL cache
+    query_cache_size=1200,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# One session per HTTP request. The scope is a per-request token rather than
+# the thread: FastAPI runs a request's dependencies and endpoint on arbitrary
+# threadpool threads, and one thread serves many requests.
+request_scope: ContextVar[Optional[object]] = ContextVar("db_request_scope", default=None)
+ScopedSession = scoped_session(SessionLocal, scopefunc=request_scope.get)
+
+
+# Surface lazy loads issued per row (N+1) while developing;
+# NPLUSONE_RAISE=1 turns the log into an error.
+if os.getenv("ENV", "dev") == "dev":
+    lazy_load_guard.install(
+        SessionLocal, raise_=os.getenv("NPLUSONE_RAISE", "0") == "1"
+    )
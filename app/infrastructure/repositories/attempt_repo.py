@@ -2,6 +2,8 @@ import logging
 from sqlalchemy.orm import Session
 from ..db.models import AttemptModel
 from fastapi import HTTPException
+# Same module path the summary router reads, so the invalidation hits its cache
+from infrastructure.repositories.subject_summary import invalidate_subject_summary
 
 logger = logging.getLogger(__name__)
 
@@ -31,10 +33,16 @@ class AttemptRepository:
             self.db.add(attempt)
             self.db.commit()
             self.db.refresh(attempt)
+            invalidate_subject_summary(user_id)
             return attempt
         except Exception as e:
             self.db.rollback()
-            logger.error(f"Error creating attempt for user {user_id}, session {session_id}: {str(e)}")
+            logger.error(
+                "Error creating attempt for user %s, session %s: %s",
+                user_id,
+                session_id,
+                str(e),
+            )
             raise HTTPException(status_code=500, detail="Could not record attempt")
 
     def get_by_session(self, session_id: int, user_id: int):
@@ -49,5 +57,10 @@ class AttemptRepository:
                 .all()
             )
         except Exception as e:
-            logger.error(f"Error fetching attempts for session {session_id}, user {user_id}: {str(e)}")
+            logger.error(
+                "Error fetching attempts for session %s, user %s: %s",
+                session_id,
+                user_id,
+                str(e),
+            )
             raise HTTPException(status_code=500, detail="Could not fetch attempts")
@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from app.infrastructure.adaptive_system.question_generation import invalidate_prompt_caches
 from app.infrastructure.db.models import Concept
+from app.infrastructure.repositories.question_repository import invalidate_candidate_templates
 
 class ConceptRepository:
     def __init__(self, db: Session):
@@ -15,6 +17,8 @@ class ConceptRepository:
         )
         self.db.add(db_concept)
         self.db.commit()
+        invalidate_candidate_templates()
+        invalidate_prompt_caches()
         self.db.refresh(db_concept)
         return db_concept
 
@@ -33,6 +37,8 @@ class ConceptRepository:
             setattr(db_concept, key, value)
         
         self.db.commit()
+        invalidate_candidate_templates()
+        invalidate_prompt_caches()
         self.db.refresh(db_concept)
         return db_concept
 
@@ -42,4 +48,6 @@ class ConceptRepository:
             return False
         self.db.delete(db_concept)
         self.db.commit()
+        invalidate_candidate_templates()
+        invalidate_prompt_caches()
         return True
@@ -1,8 +1,13 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from sqlalchemy.orm import Session
 from datetime import datetime
+from ..cache import TTLCache
 from ..db.models import LearningSession
 
+# session_id -> (user_id, topic_id). Both are fixed when the session is
+# created, so entries never go stale; the TTL only bounds memory.
+_session_owners = TTLCache(maxsize=10_000, ttl=300)
+
 class LearningSessionRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -12,7 +17,6 @@ class LearningSessionRepository:
             user_id=user_id,
             subject_id=subject_id,
             topic_id=topic_id,
-            start_time=datetime.utcnow(),
             questions_attempted=0,
             questions_correct=0
         )
@@ -36,6 +40,21 @@ class LearningSessionRepository:
     def get_session_by_id(self, session_id: int) -> Optional[LearningSession]:
         return self.db.query(LearningSession).filter(LearningSession.session_id == session_id).first()
 
+    def get_session_owner(self, session_id: int) -> Optional[Tuple[int, int]]:
+        """(user_id, topic_id) for the session, or None if it doesn't exist."""
+        owner = _session_owners.get(session_id)
+        if owner is None:
+            row = (
+                self.db.query(LearningSession.user_id, LearningSession.topic_id)
+                .filter(LearningSession.session_id == session_id)
+                .first()
+            )
+            if row is None:
+                return None
+            owner = (row.user_id, row.topic_id)
+            _session_owners.set(session_id, owner)
+        return owner
+
     def update_session_metrics(self, session_id: int, correct: bool) -> None:
         session = self.get_session_by_id(session_id)
         if session:
@@ -44,10 +63,16 @@ class LearningSessionRepository:
                 session.questions_correct += 1
             self.db.commit()
 
-    def end_session(self, session_id: int) -> Optional[LearningSession]:
-        session = self.get_session_by_id(session_id)
+    def end_session(
+        self, session_id: int, user_id: Optional[int] = None
+    ) -> Optional[LearningSession]:
+        query = self.db.query(LearningSession).filter(LearningSession.session_id == session_id)
+        if user_id is not None:
+            query = query.filter(LearningSession.user_id == user_id)
+        session = query.first()
         if session:
             session.end_time = datetime.utcnow()
             self.db.commit()
             self.db.refresh(session)
+        _session_owners.invalidate(session_id)
         return session
@@ -1,20 +1,40 @@
 from infrastructure.db.models.mcq_model import PracticeMCQ, OptionModel
 from infrastructure.db.models.topic_model import Topic
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from typing import List, Optional
 import logging
-from presentation.schemas.mcq_schema import PracticeMCQCreate, PracticeMCQUpdate
+from infrastructure.cache import TTLCache
+from presentation.schemas.mcq_schema import PracticeMCQCreate, PracticeMCQOut, PracticeMCQUpdate
 
 logger = logging.getLogger(__name__)
 
-def create_mcq(db: Session, topic_id: int, mcq_data: PracticeMCQCreate) -> PracticeMCQ:
+# Serialized MCQ lists per topic for the read-heavy practice endpoints.
+# Per process, so writes invalidate locally and the TTL bounds staleness
+# in other workers.
+_topic_mcq_cache = TTLCache(maxsize=512, ttl=300)
+
+
+def invalidate_topic_mcqs(topic_id: Optional[int] = None) -> None:
+    """Drop the cached MCQ list for one topic, or for every topic."""
+    if topic_id is None:
+        _topic_mcq_cache.clear()
+    else:
+        _topic_mcq_cache.invalidate(topic_id)
+
+
+def create_mcq(
+    db: Session, topic_id: int, mcq_data: PracticeMCQCreate, commit: bool = True
+) -> PracticeMCQ:
+    """commit=False only flushes, leaving the transaction to the caller."""
     try:
         # Verify topic exists
         topic = db.query(Topic).filter(Topic.id == topic_id).first()
         if not topic:
-            logger.warning(f"MCQ creation failed: Topic {topic_id} not found")
+            logger.warning("MCQ creation failed: Topic %s not found", topic_id)
             raise ValueError(f"Topic with ID {topic_id} does not exist.")
 
-        logger.info(f"Creating PracticeMCQ")
+        logger.info("Creating PracticeMCQ")
         mcq = PracticeMCQ(
             question_text=mcq_data.question_text,
             explanation=mcq_data.explanation,
@@ -24,36 +44,93 @@ def create_mcq(db: Session, topic_id: int, mcq_data: PracticeMCQCreate) -> Pract
         db.add(mcq)
         db.flush()  
 
-        logger.info(f"Adding {len(mcq_data.options)} options for MCQ {mcq.id}")
-        for o in mcq_data.options:
-            option = OptionModel(
-                mcq_id=mcq.id,
-                option_text=o.option_text,
-                is_correct=o.is_correct
-                )
-            db.add(option)
+        logger.info("Adding %s options for MCQ %s", len(mcq_data.options), mcq.id)
+        # One executemany for all options instead of a unit-of-work INSERT each
+        db.execute(
+            insert(OptionModel),
+            [
+                {"mcq_id": mcq.id, "option_text": o.option_text, "is_correct": o.is_correct}
+                for o in mcq_data.options
+            ],
+        )
 
+        # With commit=False the caller invalidates after its own commit
+        if not commit:
+            return mcq
+
+        # No refresh: commit expires mcq, so the caller's first attribute
+        # access reloads it (and its options) anyway
         db.commit()
-        db.refresh(mcq)
-        logger.info(f"Successfully committed MCQ {mcq.id} to database")
+        invalidate_topic_mcqs(topic_id)
+        logger.info("Successfully committed MCQ %s to database", mcq.id)
         return mcq
     except ValueError:
         raise
     except Exception as e:
-        logger.error(f"Database error during MCQ creation: {e}", exc_info=True)
+        logger.error("Database error during MCQ creation: %s", e, exc_info=True)
+        if commit:
+            db.rollback()
+        raise
+
+def bulk_create_mcqs(
+    db: Session, topic_id: int, mcqs: List[PracticeMCQCreate]
+) -> List[int]:
+    """Insert many MCQs and their options with two executemany statements and one commit."""
+    if not mcqs:
+        return []
+    try:
+        mcq_ids = db.scalars(
+            insert(PracticeMCQ).returning(PracticeMCQ.id, sort_by_parameter_order=True),
+            [
+                {
+                    "question_text": m.question_text,
+                    "explanation": m.explanation,
+                    "difficulty": m.difficulty,
+                    "topic_id": topic_id,
+                }
+                for m in mcqs
+            ],
+        ).all()
+
+        db.execute(
+            insert(OptionModel),
+            [
+                {"mcq_id": mcq_id, "option_text": o.option_text, "is_correct": o.is_correct}
+                for mcq_id, m in zip(mcq_ids, mcqs)
+                for o in m.options
+            ],
+        )
+        db.commit()
+        invalidate_topic_mcqs(topic_id)
+        logger.info("Bulk inserted %s MCQs for topic %s", len(mcq_ids), topic_id)
+        return list(mcq_ids)
+    except Exception as e:
+        logger.error("Database error during bulk MCQ creation: %s", e, exc_info=True)
         db.rollback()
         raise
 
 # get mcqs by topic id 
-def get_mcqs_by_topic_id(db: Session, topic_id: int) -> list[PracticeMCQ]:
+def get_mcqs_by_topic_id(db: Session, topic_id: int) -> list[PracticeMCQOut]:
     try:
+        cached = _topic_mcq_cache.get(topic_id)
+        if cached is not None:
+            return cached
+
         mcqs = db.query(PracticeMCQ).filter(PracticeMCQ.topic_id == topic_id).all()
-        return mcqs
+        # Serialize while the session is open; cached ORM objects would detach
+        result = [PracticeMCQOut.model_validate(m) for m in mcqs]
+        _topic_mcq_cache.set(topic_id, result)
+        return result
 
     except ValueError as e:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error during MCQ retrieval by topic ID {topic_id}: {e}", exc_info=True)
+        logger.error(
+            "Unexpected error during MCQ retrieval by topic ID %s: %s",
+            topic_id,
+            e,
+            exc_info=True,
+        )
         raise
 
 # update mcqs 
@@ -66,7 +143,7 @@ def update_mcq_by_id(
     try:
         mcq = db.query(PracticeMCQ).filter(PracticeMCQ.id == mcq_id).first()
         if not mcq:
-            logger.warning(f"MCQ update failed: MCQ {mcq_id} not found")
+            logger.warning("MCQ update failed: MCQ %s not found", mcq_id)
             raise ValueError(f"MCQ with ID {mcq_id} does not exist.")
 
         # Update scalar fields
@@ -87,13 +164,14 @@ def update_mcq_by_id(
                 )
             )
         db.commit()
+        invalidate_topic_mcqs(mcq.topic_id)
         db.refresh(mcq)
-        logger.info(f"Successfully committed MCQ {mcq.id} to database")
+        logger.info("Successfully committed MCQ %s to database", mcq.id)
         return mcq
     except ValueError as e:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error during MCQ update: {e}", exc_info=True)
+        logger.error("Unexpected error during MCQ update: %s", e, exc_info=True)
         raise
 
 
@@ -103,18 +181,20 @@ def delete_mcq_by_id(db: Session, mcq_id: int) -> None:
     try:
         mcq = db.query(PracticeMCQ).filter(PracticeMCQ.id == mcq_id).first()
         if not mcq:
-            logger.warning(f"MCQ deletion failed: MCQ {mcq_id} not found")
+            logger.warning("MCQ deletion failed: MCQ %s not found", mcq_id)
             raise ValueError(f"MCQ with ID {mcq_id} does not exist.")
 
+        topic_id = mcq.topic_id
         db.delete(mcq)
         db.commit()
-        logger.info(f"Successfully deleted MCQ {mcq_id}")
+        invalidate_topic_mcqs(topic_id)
+        logger.info("Successfully deleted MCQ %s", mcq_id)
         return {"message": f"MCQ '{mcq_id}' deleted successfully"}
 
     except ValueError:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error during MCQ deletion: {e}", exc_info=True)
+        logger.error("Unexpected error during MCQ deletion: %s", e, exc_info=True)
         db.rollback()
         raise
 
@@ -1,12 +1,14 @@
 import logging
 from typing import Optional, List, Dict, Any
 from datetime import datetime
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, joinedload, selectinload, undefer
 from sqlalchemy.exc import SQLAlchemyError
 
 from infrastructure.repository_interface.mock_test_interface import MockTestRepository
 from infrastructure.db.models.mock_test_model import MockTestModel
 from infrastructure.db.models.subject_model import MockTestSubject
+from infrastructure.db.models.mcq_model import MockTestMCQ
 from infrastructure.db.models.mock_test_session import (
     MockTestSessionModel,
     MockTestSessionAnswerModel,
@@ -22,6 +24,9 @@ class MockTestRepositoryImpl(MockTestRepository):
     Handles database operations for Mock Tests, Sessions, and Answers.
     """
 
+    # Built per request; the db handle is the only state
+    __slots__ = ("db",)
+
     def __init__(self, db: Session):
         self.db = db
 
@@ -31,7 +36,7 @@ class MockTestRepositoryImpl(MockTestRepository):
         Replacing get_mock_test_structure / get_mock_test_by_id effectively.
         """
         try:
-            logger.info(f"Fetching mock test {mock_test_id} with subjects")
+            logger.info("Fetching mock test %s with subjects", mock_test_id)
             mock_test = (
                 db.query(MockTestModel)
                 .options(joinedload(MockTestModel.subjects).joinedload(MockTestSubject.mcqs)) # Eager load subjects AND mcqs
@@ -39,13 +44,54 @@ class MockTestRepositoryImpl(MockTestRepository):
                 .first()
             )
             if not mock_test:
-                logger.warning(f"Mock test with ID {mock_test_id} not found.")
+                logger.warning("Mock test with ID %s not found.", mock_test_id)
             return mock_test
         except SQLAlchemyError as e:
-            logger.error(f"Database error fetching mock test {mock_test_id}: {e}", exc_info=True)
+            logger.error("Database error fetching mock test %s: %s", mock_test_id, e, exc_info=True)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error fetching mock test {mock_test_id}: {e}", exc_info=True)
+            logger.error(
+                "Unexpected error fetching mock test %s: %s",
+                mock_test_id,
+                e,
+                exc_info=True,
+            )
+            raise
+
+    def get_mock_test_question_ids(
+        self, db: Session, mock_test_id: int
+    ) -> Optional[List[tuple]]:
+        """
+        (mcq_id, subject_id) pairs for a mock test, grouped subject-wise.
+        Selects ids only, so no MCQ text or options are loaded.
+        Returns None when the mock test does not exist.
+        """
+        try:
+            logger.info("Fetching question ids for mock test %s", mock_test_id)
+            rows = (
+                db.query(MockTestMCQ.id, MockTestMCQ.subject_id)
+                .join(MockTestSubject, MockTestMCQ.subject_id == MockTestSubject.id)
+                .filter(MockTestSubject.mock_test_id == mock_test_id)
+                .order_by(MockTestSubject.id, MockTestMCQ.id)
+                .all()
+            )
+            if not rows:
+                exists = (
+                    db.query(MockTestModel.id)
+                    .filter(MockTestModel.id == mock_test_id)
+                    .first()
+                )
+                if not exists:
+                    logger.warning("Mock test with ID %s not found.", mock_test_id)
+                    return None
+            return rows
+        except SQLAlchemyError as e:
+            logger.error(
+                "Database error fetching question ids for mock test %s: %s",
+                mock_test_id,
+                e,
+                exc_info=True,
+            )
             raise
 
     def create_session(
@@ -57,7 +103,7 @@ class MockTestRepositoryImpl(MockTestRepository):
         expires_at: datetime,
     ):
         try:
-            logger.info(f"Creating session for user {user_id} on mock test {mock_test_id}")
+            logger.info("Creating session for user %s on mock test %s", user_id, mock_test_id)
             session = MockTestSessionModel(
                 user_id=user_id,
                 mock_test_id=mock_test_id,
@@ -69,14 +115,14 @@ class MockTestRepositoryImpl(MockTestRepository):
             db.add(session)
             db.commit()
             db.refresh(session)
-            logger.info(f"Session created successfully with ID: {session.id}")
+            logger.info("Session created successfully with ID: %s", session.id)
             return session
         except SQLAlchemyError as e:
-            logger.error(f"Database error creating session: {e}", exc_info=True)
+            logger.error("Database error creating session: %s", e, exc_info=True)
             db.rollback()
             raise
         except Exception as e:
-            logger.error(f"Unexpected error creating session: {e}", exc_info=True)
+            logger.error("Unexpected error creating session: %s", e, exc_info=True)
             db.rollback()
             raise
 
@@ -92,32 +138,35 @@ class MockTestRepositoryImpl(MockTestRepository):
         {'mcq_id': int, 'subject_id': int, 'order_index': int}
         """
         try:
-            logger.info(f"Adding {len(questions_data)} questions to session {session_id}")
-            session_questions = []
-            for q in questions_data:
-                sq = MockTestSessionQuestionModel(
-                    session_id=session_id,
-                    mcq_id=q['mcq_id'],
-                    subject_id=q['subject_id'],
-                    order_index=q['order_index']
-                )
-                session_questions.append(sq)
-            
-            db.add_all(session_questions)
+            logger.info("Adding %s questions to session %s", len(questions_data), session_id)
+            # One executemany into the mapping table instead of a unit-of-work
+            # INSERT per row
+            db.execute(
+                insert(MockTestSessionQuestionModel),
+                [
+                    {
+                        "session_id": session_id,
+                        "mcq_id": q['mcq_id'],
+                        "subject_id": q['subject_id'],
+                        "order_index": q['order_index'],
+                    }
+                    for q in questions_data
+                ],
+            )
             db.commit()
-            logger.info(f"Successfully added questions to session {session_id}")
+            logger.info("Successfully added questions to session %s", session_id)
         except SQLAlchemyError as e:
-            logger.error(f"Database error adding session questions: {e}", exc_info=True)
+            logger.error("Database error adding session questions: %s", e, exc_info=True)
             db.rollback()
             raise
         except Exception as e:
-            logger.error(f"Unexpected error adding session questions: {e}", exc_info=True)
+            logger.error("Unexpected error adding session questions: %s", e, exc_info=True)
             db.rollback()
             raise
 
     def get_active_session(self, db: Session, session_id: int, user_id: int):
         try:
-            logger.info(f"Fetching active session {session_id} for user {user_id}")
+            logger.info("Fetching active session %s for user %s", session_id, user_id)
             session = (
                 db.query(MockTestSessionModel)
                 .filter(
@@ -128,13 +177,13 @@ class MockTestRepositoryImpl(MockTestRepository):
                 .first()
             )
             if not session:
-                logger.warning(f"Active session {session_id} for user {user_id} not found.")
+                logger.warning("Active session %s for user %s not found.", session_id, user_id)
             return session
         except SQLAlchemyError as e:
-            logger.error(f"Database error fetching active session: {e}", exc_info=True)
+            logger.error("Database error fetching active session: %s", e, exc_info=True)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error fetching active session: {e}", exc_info=True)
+            logger.error("Unexpected error fetching active session: %s", e, exc_info=True)
             raise
 
     def get_active_session_for_user_test(self, db: Session, user_id: int, mock_test_id: int):
@@ -142,7 +191,11 @@ class MockTestRepositoryImpl(MockTestRepository):
         Checks if there is any active session for a specific user and mock test.
         """
         try:
-            logger.info(f"Checking existing active session for user {user_id} on test {mock_test_id}")
+            logger.info(
+                "Checking existing active session for user %s on test %s",
+                user_id,
+                mock_test_id,
+            )
             session = (
                 db.query(MockTestSessionModel)
                 .filter(
@@ -154,20 +207,30 @@ class MockTestRepositoryImpl(MockTestRepository):
             )
             return session
         except SQLAlchemyError as e:
-            logger.error(f"Database error checking active session: {e}", exc_info=True)
+            logger.error("Database error checking active session: %s", e, exc_info=True)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error checking active session: {e}", exc_info=True)
+            logger.error("Unexpected error checking active session: %s", e, exc_info=True)
             raise
 
     def get_session_questions(self, db: Session, session_id: int):
         try:
-            logger.info(f"Fetching questions for session {session_id}")
+            logger.info("Fetching questions for session %s", session_id)
             questions = (
                 db.query(MockTestSessionQuestionModel)
                 .options(
-                    joinedload(MockTestSessionQuestionModel.mcq), # Load MCQ details
-                    joinedload(MockTestSessionQuestionModel.subject) # Load Subject details
+                    # MCQ details, its options in one IN query, and the
+                    # correct option id computed in the same SELECT
+                    joinedload(MockTestSessionQuestionModel.mcq)
+                    .load_only(MockTestMCQ.id, MockTestMCQ.question_text)
+                    .options(
+                        selectinload(MockTestMCQ.options),
+                        undefer(MockTestMCQ.correct_option_id),
+                    ),
+                    # Only the subject name is shown per question
+                    joinedload(MockTestSessionQuestionModel.subject).load_only(
+                        MockTestSubject.name
+                    ),
                 )
                 .filter(MockTestSessionQuestionModel.session_id == session_id)
                 .order_by(MockTestSessionQuestionModel.order_index)
@@ -175,10 +238,10 @@ class MockTestRepositoryImpl(MockTestRepository):
             )
             return questions
         except SQLAlchemyError as e:
-            logger.error(f"Database error fetching session questions: {e}", exc_info=True)
+            logger.error("Database error fetching session questions: %s", e, exc_info=True)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error fetching session questions: {e}", exc_info=True)
+            logger.error("Unexpected error fetching session questions: %s", e, exc_info=True)
             raise
 
     def upsert_answer(
@@ -189,7 +252,7 @@ class MockTestRepositoryImpl(MockTestRepository):
         selected_option_id: Optional[int],
     ):
         try:
-            logger.info(f"Upserting answer for session {session_id}, mcq {mcq_id}")
+            logger.info("Upserting answer for session %s, mcq %s", session_id, mcq_id)
             answer = (
                 db.query(MockTestSessionAnswerModel)
                 .filter(
@@ -214,17 +277,17 @@ class MockTestRepositoryImpl(MockTestRepository):
             db.commit()
             return answer
         except SQLAlchemyError as e:
-            logger.error(f"Database error upserting answer: {e}", exc_info=True)
+            logger.error("Database error upserting answer: %s", e, exc_info=True)
             db.rollback()
             raise
         except Exception as e:
-            logger.error(f"Unexpected error upserting answer: {e}", exc_info=True)
+            logger.error("Unexpected error upserting answer: %s", e, exc_info=True)
             db.rollback()
             raise
 
     def get_session_answers(self, db: Session, session_id: int):
         try:
-            logger.info(f"Fetching answers for session {session_id}")
+            logger.info("Fetching answers for session %s", session_id)
             answers = (
                 db.query(MockTestSessionAnswerModel)
                 .options(joinedload(MockTestSessionAnswerModel.selected_option)) # Load option for evaluation
@@ -233,15 +296,25 @@ class MockTestRepositoryImpl(MockTestRepository):
             )
             return answers
         except SQLAlchemyError as e:
-            logger.error(f"Database error fetching answers for session {session_id}: {e}", exc_info=True)
+            logger.error(
+                "Database error fetching answers for session %s: %s",
+                session_id,
+                e,
+                exc_info=True,
+            )
             raise
         except Exception as e:
-            logger.error(f"Unexpected error fetching answers for session {session_id}: {e}", exc_info=True)
+            logger.error(
+                "Unexpected error fetching answers for session %s: %s",
+                session_id,
+                e,
+                exc_info=True,
+            )
             raise
 
     def mark_session_submitted(self, db: Session, session_id: int):
         try:
-            logger.info(f"Marking session {session_id} as submitted")
+            logger.info("Marking session %s as submitted", session_id)
             session = (
                 db.query(MockTestSessionModel)
                 .filter(MockTestSessionModel.id == session_id)
@@ -252,22 +325,22 @@ class MockTestRepositoryImpl(MockTestRepository):
                 session.is_submitted = True
                 session.is_active = False
                 db.commit()
-                logger.info(f"Session {session_id} marked as submitted.")
+                logger.info("Session %s marked as submitted.", session_id)
             else:
-                logger.warning(f"Session {session_id} not found to mark submitted.")
+                logger.warning("Session %s not found to mark submitted.", session_id)
             return session
         except SQLAlchemyError as e:
-            logger.error(f"Database error marking session submitted: {e}", exc_info=True)
+            logger.error("Database error marking session submitted: %s", e, exc_info=True)
             db.rollback()
             raise
         except Exception as e:
-            logger.error(f"Unexpected error marking session submitted: {e}", exc_info=True)
+            logger.error("Unexpected error marking session submitted: %s", e, exc_info=True)
             db.rollback()
             raise
 
     def get_session_by_id(self, db: Session, session_id: int):
         try:
-            logger.info(f"Fetching session info for session {session_id}")
+            logger.info("Fetching session info for session %s", session_id)
             session = (
                 db.query(MockTestSessionModel)
                 .options(joinedload(MockTestSessionModel.mock_test)) # Eager load mock test just in case
@@ -275,11 +348,29 @@ class MockTestRepositoryImpl(MockTestRepository):
                 .first()
             )
             if not session:
-                logger.warning(f"Session {session_id} not found.")
+                logger.warning("Session %s not found.", session_id)
             return session
         except SQLAlchemyError as e:
-            logger.error(f"Database error fetching session {session_id}: {e}", exc_info=True)
+            logger.error("Database error fetching session %s: %s", session_id, e, exc_info=True)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error fetching session {session_id}: {e}", exc_info=True)
+            logger.error("Unexpected error fetching session %s: %s", session_id, e, exc_info=True)
+            raise
+
+    def get_user_session_state(self, db: Session, session_id: int, user_id: int):
+        """
+        Returns (id, is_submitted) for a session owned by user_id, or None when
+        the session does not exist or belongs to someone else.
+        """
+        try:
+            return (
+                db.query(MockTestSessionModel.id, MockTestSessionModel.is_submitted)
+                .filter(
+                    MockTestSessionModel.id == session_id,
+                    MockTestSessionModel.user_id == user_id,
+                )
+                .first()
+            )
+        except SQLAlchemyError as e:
+            logger.error("Database error fetching session %s: %s", session_id, e, exc_info=True)
             raise
@@ -1,8 +1,10 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session, selectinload
 from infrastructure.db.models.mock_test_model import MockTestModel, mock_test_mcq_association
 from infrastructure.db.models.mcq_model import MockTestMCQ, MockTestOption, PracticeMCQ
 from infrastructure.db.models.subject_model import MockTestSubject
-from presentation.schemas.mock_test_schema import MockTestBulkCreate, QuestionCreate
+from presentation.schemas.mock_test_schema import MockTestBulkCreate, MockTestOut
+from infrastructure.cache import TTLCache
 from infrastructure.db.models.mock_test_session import (
     MockTestSessionModel,
     MockTestSessionAnswerModel,
@@ -12,6 +14,11 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# The mock test listing is the same for every user and only changes when an
+# admin uploads or deletes a test; both clear it
+MOCK_TESTS_KEY = "mock_tests:all"
+_mock_test_cache = TTLCache(maxsize=16, ttl=120)
+
 
 class MockTestRepository:
     """Repository for managing Mock Tests and their associated subjects and questions."""
@@ -19,58 +26,61 @@ class MockTestRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def _get_or_create_subject(self, subject_name: str, mock_test_id: int) -> int:
-        """Helper to get or create a MockTestSubject within a specific MockTest."""
-        subject_name = subject_name.strip()
-        subject = (
-            self.db.query(MockTestSubject)
-            .filter(
-                MockTestSubject.mock_test_id == mock_test_id,
-                MockTestSubject.name == subject_name,
-            )
-            .first()
+    def _create_subjects(self, subject_names: set[str], mock_test_id: int) -> dict[str, int]:
+        """
+        Insert the subjects of a newly created MockTest and map their names to
+        ids. The test has no subjects yet, so this is a single INSERT.
+        """
+        names = sorted(subject_names)
+        new_ids = self.db.scalars(
+            insert(MockTestSubject).returning(
+                MockTestSubject.id, sort_by_parameter_order=True
+            ),
+            [{"name": name, "mock_test_id": mock_test_id} for name in names],
+        ).all()
+        logger.info(
+            "Created %s MockTestSubjects for MockTest %s",
+            len(names),
+            mock_test_id,
         )
-
-        if not subject:
-            subject = MockTestSubject(name=subject_name, mock_test_id=mock_test_id)
-            self.db.add(subject)
-            self.db.flush()
-            logger.info(
-                f"Created new MockTestSubject '{subject_name}' for MockTest {mock_test_id}"
-            )
-
-        return subject.id
-
-    def _create_mcq_with_options(
-        self, question_data: QuestionCreate, subject_id: int, mock_test_id: int
-    ) -> MockTestMCQ:
-        """Helper to create a MockTestMCQ and its associated options."""
-        mcq = MockTestMCQ(
-            question_text=question_data.question_text.strip(),
-            subject_id=subject_id,
-            mock_test_id=mock_test_id,
-        )
-        self.db.add(mcq)
-        self.db.flush()
-
-        for opt_data in question_data.options:
-            option = MockTestOption(
-                mcq_id=mcq.id,
-                option_text=opt_data.option_text.strip(),
-                is_correct=opt_data.is_correct,
-            )
-            self.db.add(option)
-
-        return mcq
+        return dict(zip(names, new_ids))
 
     def get_all(self) -> list[MockTestModel]:
         """Fetch all mock tests."""
         try:
             return self.db.query(MockTestModel).all()
         except Exception as e:
-            logger.error(f"Error fetching all mock tests: {e}")
+            logger.error("Error fetching all mock tests: %s", e)
             raise
 
+    def list_mock_tests(self) -> list[MockTestOut]:
+        """Mock test listing with question counts, cached."""
+        cached = _mock_test_cache.get(MOCK_TESTS_KEY)
+        if cached is not None:
+            return cached
+
+        # Questions are counted from the association rows in the same query,
+        # not by loading each test's questions collection
+        rows = (
+            self.db.query(
+                MockTestModel.id,
+                MockTestModel.title,
+                func.count(mock_test_mcq_association.c.mcq_id),
+            )
+            .outerjoin(
+                mock_test_mcq_association,
+                mock_test_mcq_association.c.mock_test_id == MockTestModel.id,
+            )
+            .group_by(MockTestModel.id)
+            .all()
+        )
+        result = [
+            MockTestOut(id=test_id, title=title, total_questions=total)
+            for test_id, title, total in rows
+        ]
+        _mock_test_cache.set(MOCK_TESTS_KEY, result)
+        return result
+
     def get_by_id(self, mock_test_id: int) -> MockTestModel:
         """Fetch a mock test with its questions by ID."""
         try:
@@ -85,12 +95,33 @@ class MockTestRepository:
         except ValueError:
             raise
         except Exception as e:
-            logger.error(f"Error fetching mock test {mock_test_id}: {e}")
+            logger.error("Error fetching mock test %s: %s", mock_test_id, e)
             raise
 
     def get_mock_test_with_questions(self, mock_test_id: int) -> MockTestModel:
-        """Fetch a mock test with its questions by ID (Alias for get_by_id)."""
-        return self.get_by_id(mock_test_id)
+        """
+        Fetch a mock test by ID with its questions and their options loaded:
+        one query per level (test, questions, options) however many questions.
+        """
+        try:
+            mock_test = (
+                self.db.query(MockTestModel)
+                .options(
+                    selectinload(MockTestModel.questions).selectinload(
+                        MockTestMCQ.options
+                    )
+                )
+                .filter(MockTestModel.id == mock_test_id)
+                .first()
+            )
+            if not mock_test:
+                raise ValueError(f"Mock Test {mock_test_id} not found")
+            return mock_test
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error("Error fetching mock test %s: %s", mock_test_id, e)
+            raise
 
     def bulk_create_mock_test(
         self, data: MockTestBulkCreate, admin_id: int
@@ -100,53 +131,81 @@ class MockTestRepository:
         """
         try:
             logger.info(
-                f"Starting bulk creation of mock test: {data.title} with {len(data.questions)} questions"
+                "Starting bulk creation of mock test: %s with %s questions",
+                data.title,
+                len(data.questions),
             )
 
-            # 1. Create the Mock Test header
-            mock_test = MockTestModel(title=data.title.strip())
-            self.db.add(mock_test)
-            self.db.flush()
-
-            subject_cache = {}  # Cache subject names to IDs for this mock test
-            created_mcqs = []
-
-            # 2. Process each question
-            for idx, q_data in enumerate(data.questions, start=1):
-                # Resolve subject
-                subject_name = q_data.subject.strip()
-                if subject_name not in subject_cache:
-                    subject_cache[subject_name] = self._get_or_create_subject(
-                        subject_name, mock_test.id
-                    )
-
-                subject_id = subject_cache[subject_name]
-
-                # Create MCQ and options
-                mcq = self._create_mcq_with_options(q_data, subject_id, mock_test.id)
-                created_mcqs.append(mcq)
+            # 1. Create the Mock Test header. Every write below is a direct
+            # INSERT ... RETURNING / executemany, so the unit of work never
+            # has to flush and the whole upload is a single commit.
+            mock_test = self.db.scalars(
+                insert(MockTestModel).returning(MockTestModel),
+                [{"title": data.title.strip()}],
+            ).one()
+
+            # 2. Resolve the subject of each question
+            subject_names = [q_data.subject.strip() for q_data in data.questions]
+            subject_cache = self._create_subjects(set(subject_names), mock_test.id)
+            subject_ids = [subject_cache[name] for name in subject_names]
+
+            # 3. Insert all MCQs in one executemany; ids come back in input order
+            mcq_ids = self.db.scalars(
+                insert(MockTestMCQ).returning(MockTestMCQ.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "question_text": q_data.question_text.strip(),
+                        "subject_id": subject_id,
+                        "mock_test_id": mock_test.id,
+                    }
+                    for q_data, subject_id in zip(data.questions, subject_ids)
+                ],
+            ).all()
+
+            # 4. Insert every option in one executemany
+            self.db.execute(
+                insert(MockTestOption),
+                [
+                    {
+                        "mcq_id": mcq_id,
+                        "option_text": opt_data.option_text.strip(),
+                        "is_correct": opt_data.is_correct,
+                    }
+                    for mcq_id, q_data in zip(mcq_ids, data.questions)
+                    for opt_data in q_data.options
+                ],
+            )
 
-            # 3. Establish Many-to-Many relationship
-            mock_test.questions = created_mcqs
+            # 5. Establish Many-to-Many relationship
+            self.db.execute(
+                insert(mock_test_mcq_association),
+                [{"mock_test_id": mock_test.id, "mcq_id": mcq_id} for mcq_id in mcq_ids],
+            )
 
+            # id/title/created_at are already loaded from RETURNING; detach so
+            # the commit doesn't expire them and the caller reads them for free
+            self.db.expunge(mock_test)
             self.db.commit()
-            self.db.refresh(mock_test)
+            _mock_test_cache.invalidate(MOCK_TESTS_KEY)
 
             logger.info(
-                f"Successfully created mock test '{data.title}' (ID: {mock_test.id}) "
-                f"with {len(created_mcqs)} questions across {len(subject_cache)} subjects"
+                "Successfully created mock test '%s' (ID: %s) with %s questions across %s subjects",
+                data.title,
+                mock_test.id,
+                len(mcq_ids),
+                len(subject_cache),
             )
             return mock_test
 
         except Exception as e:
-            logger.error(f"Error during bulk mock test creation: {e}", exc_info=True)
+            logger.error("Error during bulk mock test creation: %s", e, exc_info=True)
             self.db.rollback()
             raise
 
     def delete_mock_test(self, mock_test_id: int) -> None:
         """Delete a mock test and all its associated subjects, questions, and options."""
         try:
-            logger.info(f"Starting deletion of mock test {mock_test_id}")
+            logger.info("Starting deletion of mock test %s", mock_test_id)
 
             # 1. Delete all associated sessions first (and their dependent data)
             # Delete session answers
@@ -196,9 +255,10 @@ class MockTestRepository:
             ).delete(synchronize_session=False)
 
             self.db.commit()
-            logger.info(f"Successfully deleted mock test {mock_test_id}")
+            _mock_test_cache.invalidate(MOCK_TESTS_KEY)
+            logger.info("Successfully deleted mock test %s", mock_test_id)
 
         except Exception as e:
-            logger.error(f"Error deleting mock test {mock_test_id}: {e}", exc_info=True)
+            logger.error("Error deleting mock test %s: %s", mock_test_id, e, exc_info=True)
             self.db.rollback()
             raise
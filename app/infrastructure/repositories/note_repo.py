@@ -21,7 +21,7 @@ def create_note(
     # Verify topic exists
     topic = db.query(Topic).filter(Topic.id == topic_id).first()
     if not topic:
-        logger.warning(f"Note creation failed: Topic {topic_id} not found")
+        logger.warning("Note creation failed: Topic %s not found", topic_id)
         raise ValueError(f"Topic with ID {topic_id} does not exist.")
 
     # Optional: basic input validation
@@ -32,7 +32,7 @@ def create_note(
         db.query(Note).filter(Note.title == title, Note.topic_id == topic_id).first()
     )
     if existing:
-        logger.warning(f"Duplicate note '{title}' for topic_id {topic_id}")
+        logger.warning("Duplicate note '%s' for topic_id %s", title, topic_id)
         raise ValueError(f"Note '{title}' already exists for topic {topic_id}")
 
     note = Note(
@@ -48,30 +48,31 @@ def create_note(
         db.commit()
         db.refresh(note)
         logger.info(
-            f"Created note '{note.title}' (ID: {note.id}) for topic_id {note.topic_id}"
+            "Created note '%s' (ID: %s) for topic_id %s",
+            note.title,
+            note.id,
+            note.topic_id,
         )
         return note
 
     except IntegrityError as e:
         db.rollback()
-        logger.error(f"DB integrity error creating note: {e}")
+        logger.error("DB integrity error creating note: %s", e)
         raise ValueError(f"Invalid topic_id or duplicate note: {str(e)}")
 
     except Exception as e:
         db.rollback()
-        logger.error(f"Unexpected error creating note: {e}", exc_info=True)
+        logger.error("Unexpected error creating note: %s", e, exc_info=True)
         raise
 
 
 def get_notes_by_topic(db: Session, topic_id: int) -> List[Note]:
     try:
         notes: List[Note] = db.query(Note).filter(Note.topic_id == topic_id).all()
-        logger.info(f"Retrived {len(notes)} notes for topic_id={topic_id}")
+        logger.info("Retrived %s notes for topic_id=%s", len(notes), topic_id)
         return notes
     except Exception as e:
-        logger.error(
-            f"Error fetching notes for topic_id = {topic_id}: {e}", exc_info=True
-        )
+        logger.error("Error fetching notes for topic_id = %s: %s", topic_id, e, exc_info=True)
         raise
 
 
@@ -80,15 +81,15 @@ def get_note_by_id(db: Session, note_id: int) -> Note:
     try:
         note = db.query(Note).filter(Note.id == note_id).first()
         if not note:
-            logger.warning(f"Note with id {note_id} not found")
+            logger.warning("Note with id %s not found", note_id)
             raise ValueError(f"Note with id {note_id} not found")
 
-        logger.info(f"Retrieved note: {note.title} (ID: {note_id})")
+        logger.info("Retrieved note: %s (ID: %s)", note.title, note_id)
         return note
     except ValueError:
         raise
     except Exception as e:
-        logger.error(f"Error fetching note {note_id}: {e}", exc_info=True)
+        logger.error("Error fetching note %s: %s", note_id, e, exc_info=True)
         raise
 
 
@@ -113,10 +114,10 @@ def get_all_notes(db: Session) -> List[Dict]:
                 }
             )
 
-        logger.info(f"Retrieved {len(notes)} notes")
+        logger.info("Retrieved %s notes", len(notes))
         return result
     except Exception as e:
-        logger.error(f"Error fetching all notes: {e}", exc_info=True)
+        logger.error("Error fetching all notes: %s", e, exc_info=True)
         raise
 
 
@@ -142,7 +143,7 @@ def update_note(
             )
 
             if existing:
-                logger.warning(f"Cannot update note {note_id}: title already exists")
+                logger.warning("Cannot update note %s: title already exists", note_id)
                 raise ValueError(
                     f"Note '{note_data.title}' already exists for this topic"
                 )
@@ -153,21 +154,18 @@ def update_note(
         db.commit()
         db.refresh(note)
 
-        logger.info(f"Updated note '{note.title}' (ID={note_id})")
+        logger.info("Updated note '%s' (ID=%s)", note.title, note_id)
         return note
 
     except IntegrityError as e:
         db.rollback()
-        logger.error(f"Database integrity error updating note {note_id}: {e}")
+        logger.error("Database integrity error updating note %s: %s", note_id, e)
         raise ValueError("Database constraint error")
     except ValueError:
         raise
     except Exception as e:
         db.rollback()
-        logger.error(
-            f"Unexpected error updating note {note_id}: {e}",
-            exc_info=True,
-        )
+        logger.error("Unexpected error updating note %s: %s", note_id, e, exc_info=True)
         raise
 
 
@@ -180,19 +178,16 @@ def delete_note(db: Session, note_id: int):
         db.delete(note)
         db.commit()
 
-        logger.info(f"Deleted note '{note_title}' (ID={note_id})")
+        logger.info("Deleted note '%s' (ID=%s)", note_title, note_id)
         return {"message": f"Note '{note_title}' deleted successfully"}
 
     except IntegrityError as e:
         db.rollback()
-        logger.error(f"Cannot delete note {note_id}: {e}")
+        logger.error("Cannot delete note %s: %s", note_id, e)
         raise ValueError("Cannot delete note due to database constraints")
     except ValueError:
         raise
     except Exception as e:
         db.rollback()
-        logger.error(
-            f"Unexpected error deleting note {note_id}: {e}",
-            exc_info=True,
-        )
+        logger.error("Unexpected error deleting note %s: %s", note_id, e, exc_info=True)
         raise
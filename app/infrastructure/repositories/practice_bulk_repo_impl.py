@@ -1,28 +1,95 @@
+import numpy as np
 import pandas as pd
 import io
 import logging
-from typing import Tuple, List
+from typing import BinaryIO, Tuple, List, Union
 from sqlalchemy.orm import Session
 from infrastructure.db.models.mcq_model import PracticeMCQ, OptionModel
 from infrastructure.db.models.topic_model import Topic
 from presentation.schemas.mcq_schema import PracticeMCQCreate, PracticeOptionCreate
 from presentation.schemas.practice_bulk_schema import PracticeBulkUploadResponse
-from infrastructure.repositories.mcq_repo_impl import create_mcq
+from infrastructure.repositories.mcq_repo_impl import (
+    create_mcq,
+    bulk_create_mcqs,
+    invalidate_topic_mcqs,
+)
 
 logger = logging.getLogger(__name__)
 
+# Columns consumed by _process_rows, in itertuples order
+ROW_COLUMNS = [
+    "question_text",
+    "option1",
+    "option2",
+    "option3",
+    "option4",
+    "correct_answer",
+    "explanation",
+    "difficulty",
+]
+
+# Column order unpacked by _build_rows; derived columns come from _normalize_values
+BUILD_COLUMNS = ROW_COLUMNS + ["correct_idx", "row_error"]
+
+# Mirrors the max_length limits on PracticeMCQCreate / PracticeOptionCreate
+MAX_TEXT_LENGTH = 300
+
+
+def _build_rows(df: pd.DataFrame) -> Tuple[List[Tuple[int, PracticeMCQCreate]], List[str]]:
+    """
+    Turn normalized rows into (row_number, PracticeMCQCreate) pairs plus error
+    messages.
+    """
+    valid_rows = []
+    errors = []
+
+    # Zip plain Python lists in a fixed column order: no per-row Series,
+    # tuple construction from frame blocks, or column-name lookups
+    columns = [df[col].tolist() for col in BUILD_COLUMNS]
+    for (
+        index, question_text, o1, o2, o3, o4, correct_val, expl, diff, correct_idx, row_error
+    ) in zip(df.index.tolist(), *columns):
+        try:
+            if row_error:
+                raise ValueError(row_error)
+            if correct_idx < 0:
+                raise ValueError(f"Invalid correct_answer: '{correct_val}' does not match any option or 1-4 index")
+
+            # Rows are fully checked in _normalize_values, so skip pydantic validation
+            options = [
+                PracticeOptionCreate.model_construct(option_text=text, is_correct=i == correct_idx)
+                for i, text in enumerate((o1, o2, o3, o4))
+            ]
+            mcq_data = PracticeMCQCreate.model_construct(
+                question_text=question_text,
+                explanation=expl,
+                difficulty=diff,
+                options=options,
+            )
+
+            valid_rows.append((index + 2, mcq_data))
+
+        except Exception as e:
+            errors.append(f"Row {index + 2}: {str(e)}")
+
+    return valid_rows, errors
+
+
 class PracticeBulkRepository:
     def __init__(self, db: Session):
         self.db = db
 
     def process_bulk_upload(
         self,
-        file_content: bytes,
+        file_content: Union[bytes, BinaryIO],
         filename: str,
         topic_id: int,
         admin_id: int,
     ):
-        """Process bulk upload for practice mode"""
+        """
+        Process bulk upload for practice mode. file_content may be raw bytes or
+        a seekable binary file (e.g. UploadFile.file) which is parsed in place.
+        """
         try:
             # 1. Verify Topic exists
             topic = self.db.query(Topic).filter(Topic.id == topic_id).first()
@@ -31,42 +98,56 @@ class PracticeBulkRepository:
 
             df = self._read_and_clean_df(file_content, filename)
             
-            required_cols = [
-                "question_text",
-                "option1",
-                "option2",
-                "option3",
-                "option4",
-                "correct_answer",
-                "explanation",
-                "difficulty",
-            ]
-            self._validate_columns(df, required_cols)
+            self._validate_columns(df, ROW_COLUMNS)
+            df = self._normalize_values(df)
 
-            response = self._process_rows(
-                df, topic_id, admin_id
-            )
+            # Rows are inserted via Core / explicit flushes; skip implicit autoflush
+            with self.db.no_autoflush:
+                response = self._process_rows(
+                    df, topic_id, admin_id
+                )
             return response
         except Exception as e:
-            logger.error(f"Bulk upload error: {e}", exc_info=True)
+            logger.error("Bulk upload error: %s", e, exc_info=True)
             raise
 
-    def _read_and_clean_df(self, file_content: bytes, filename: str) -> pd.DataFrame:
+    def _read_and_clean_df(
+        self, file_content: Union[bytes, BinaryIO], filename: str
+    ) -> pd.DataFrame:
+        file_obj = io.BytesIO(file_content) if isinstance(file_content, bytes) else file_content
         if filename.endswith(".csv"):
-            try:
-                df = pd.read_csv(
-                    io.BytesIO(file_content), on_bad_lines="skip", engine="python"
-                )
-            except Exception as e:
-                raise ValueError(f"Error parsing CSV: {e}")
+            df = self._read_csv(file_obj)
         elif filename.endswith((".xlsx", ".xls")):
-            df = pd.read_excel(io.BytesIO(file_content))
+            df = self._read_excel(file_obj)
         else:
             raise ValueError("Unsupported file format. Please upload CSV or XLSX.")
 
         df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
         return df
 
+    def _read_csv(self, file_obj: BinaryIO) -> pd.DataFrame:
+        # pyarrow's multithreaded parser when available, otherwise the C engine
+        try:
+            return pd.read_csv(file_obj, engine="pyarrow", on_bad_lines="skip")
+        except ImportError:
+            pass
+        except Exception as e:
+            logger.warning("pyarrow CSV parse failed, falling back to C engine: %s", e)
+
+        file_obj.seek(0)
+        try:
+            return pd.read_csv(file_obj, on_bad_lines="skip", engine="c")
+        except Exception as e:
+            raise ValueError(f"Error parsing CSV: {e}")
+
+    def _read_excel(self, file_obj: BinaryIO) -> pd.DataFrame:
+        # calamine (python-calamine) is much faster than openpyxl when installed
+        try:
+            return pd.read_excel(file_obj, engine="calamine")
+        except (ImportError, ValueError):
+            file_obj.seek(0)
+            return pd.read_excel(file_obj)
+
     def _validate_columns(self, df: pd.DataFrame, required_cols: List[str]):
         missing_cols = [col for col in required_cols if col not in df.columns]
         if missing_cols:
@@ -74,72 +155,83 @@ class PracticeBulkRepository:
                 f"Missing required columns for practice mode: {', '.join(missing_cols)}"
             )
 
+    def _normalize_values(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Vectorized cell cleaning: NaN -> "", strip every cell, lowercase difficulty."""
+        df = df[ROW_COLUMNS].fillna("").astype(str)
+        for col in ROW_COLUMNS:
+            df[col] = df[col].str.strip()
+        df["difficulty"] = df["difficulty"].str.lower()
+        df["correct_idx"] = self._resolve_correct_idx(df)
+        df["row_error"] = self._length_errors(df)
+        # Empty optional fields become None once here rather than per row
+        for col in ("explanation", "difficulty"):
+            values = df[col].to_numpy()
+            df[col] = np.where(values == "", None, values)
+        return df
+
+    def _length_errors(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Per-row message for the first field that violates the PracticeMCQCreate /
+        PracticeOptionCreate length limits, or "" when the row is fine. Lets the
+        row loop build schema objects with model_construct.
+        """
+        conditions = []
+        messages = []
+
+        def check(col: str, allow_empty: bool = False):
+            lengths = df[col].str.len().to_numpy()
+            if not allow_empty:
+                conditions.append(lengths < 1)
+                messages.append(f"{col} must not be empty")
+            conditions.append(lengths > MAX_TEXT_LENGTH)
+            messages.append(f"{col} must be at most {MAX_TEXT_LENGTH} characters")
+
+        check("question_text")
+        for i in range(1, 5):
+            check(f"option{i}")
+        check("explanation", allow_empty=True)
+
+        return np.select(conditions, messages, default="")
+
+    def _resolve_correct_idx(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        0-based index of the correct option per row, or -1 when unresolved.
+        Numeric answers are treated as a 1-4 index; anything else is matched
+        against the option texts.
+        """
+        answers = df["correct_answer"].to_numpy()
+        numeric = pd.to_numeric(df["correct_answer"], errors="coerce").to_numpy()
+        num_idx = np.trunc(numeric) - 1
+        num_idx = np.where((num_idx >= 0) & (num_idx <= 3), num_idx, -1)
+
+        matches = np.stack(
+            [df[f"option{i}"].to_numpy() == answers for i in range(1, 5)], axis=1
+        )
+        text_idx = np.where(matches.any(axis=1), matches.argmax(axis=1), -1)
+
+        return np.where(np.isnan(numeric), text_idx, num_idx).astype(int)
+
     def _process_rows(
         self,
         df: pd.DataFrame,
         topic_id: int,
         admin_id: int,
     ) -> PracticeBulkUploadResponse:
-        inserted = 0
-        failed = 0
-        errors = []
-
-        for index, row in df.iterrows():
-            try:
-                # Basic row cleaning
-                def get_val(key):
-                    val = row.get(key)
-                    return str(val).strip() if not pd.isna(val) else ""
-
-                # Create options
-                options = [
-                    PracticeOptionCreate(option_text=get_val("option1"), is_correct=False),
-                    PracticeOptionCreate(option_text=get_val("option2"), is_correct=False),
-                    PracticeOptionCreate(option_text=get_val("option3"), is_correct=False),
-                    PracticeOptionCreate(option_text=get_val("option4"), is_correct=False),
-                ]
-
-                # Determine correct answer
-                correct_val = get_val("correct_answer")
-                correct_idx = -1
-                
-                # Check if it's a numeric index (1-4)
-                try:
-                    num_val = int(float(correct_val))
-                    if 1 <= num_val <= 4:
-                        correct_idx = num_val - 1
-                except (ValueError, TypeError):
-                    # Match by text
-                    for i, opt in enumerate(options):
-                        if opt.option_text == correct_val:
-                            correct_idx = i
-                            break
-
-                if correct_idx < 0:
-                    raise ValueError(f"Invalid correct_answer: '{correct_val}' does not match any option or 1-4 index")
-
-                options[correct_idx].is_correct = True
-
-                # Explanation and Difficulty
-                expl = get_val("explanation") or None
-                diff = get_val("difficulty").lower() or None
-
-                mcq_data = PracticeMCQCreate(
-                    question_text=get_val("question_text"),
-                    explanation=expl,
-                    topic_id=topic_id,
-                    difficulty=diff,
-                    options=options,
-                )
+        valid_rows, errors = _build_rows(df)
+        failed = len(errors)
 
-                # Use the existing create_mcq function which handles the DB storage
-                create_mcq(self.db, topic_id, mcq_data)
-                inserted += 1
+        inserted, insert_failed, insert_errors = self._insert_rows(valid_rows, topic_id)
+        failed += insert_failed
+        errors.extend(insert_errors)
 
-            except Exception as e:
-                failed += 1
-                errors.append(f"Row {index + 2}: {str(e)}")
-                logger.error(f"Error processing row {index + 2}: {e}")
+        # Per-row detail goes back in the response; log a single summary
+        if failed:
+            logger.warning(
+                "Bulk upload for topic %s had %s failed rows; first 10: %s",
+                topic_id,
+                failed,
+                errors[:10],
+            )
 
         return PracticeBulkUploadResponse(
             total_rows=len(df),
@@ -148,3 +240,30 @@ class PracticeBulkRepository:
             skipped=0,
             errors=errors,
         )
+
+    def _insert_rows(
+        self, valid_rows: List[Tuple[int, PracticeMCQCreate]], topic_id: int
+    ) -> Tuple[int, int, List[str]]:
+        """Batch insert validated rows; fall back to row-by-row inserts to report failures."""
+        if not valid_rows:
+            return 0, 0, []
+        try:
+            bulk_create_mcqs(self.db, topic_id, [mcq for _, mcq in valid_rows])
+            return len(valid_rows), 0, []
+        except Exception as e:
+            logger.warning("Batch insert failed, retrying row by row: %s", e)
+
+        # Each row in its own SAVEPOINT so one bad row doesn't discard the rest;
+        # a single commit at the end
+        inserted = 0
+        errors = []
+        for row_number, mcq_data in valid_rows:
+            try:
+                with self.db.begin_nested():
+                    create_mcq(self.db, topic_id, mcq_data, commit=False)
+                inserted += 1
+            except Exception as e:
+                errors.append(f"Row {row_number}: {str(e)}")
+        self.db.commit()
+        invalidate_topic_mcqs(topic_id)
+        return inserted, len(errors), errors
@@ -23,7 +23,12 @@ class PracticeSessionRepository:
             return session
         except Exception as e:
             self.db.rollback()
-            logger.error(f"Error creating practice session for user {user_id}, topic {topic_id}: {str(e)}")
+            logger.error(
+                "Error creating practice session for user %s, topic %s: %s",
+                user_id,
+                topic_id,
+                str(e),
+            )
             raise HTTPException(status_code=500, detail="Could not create practice session")
 
     def add_questions(self, session_id: int, mcqs: list[object]):
@@ -41,7 +46,7 @@ class PracticeSessionRepository:
             self.db.commit()
         except Exception as e:
             self.db.rollback()
-            logger.error(f"Error adding questions to session {session_id}: {str(e)}")
+            logger.error("Error adding questions to session %s: %s", session_id, str(e))
             raise HTTPException(status_code=500, detail="Could not add questions to session")
 
     def get_active(self, session_id: int, user_id: int) -> PracticeSessionModel:
@@ -57,13 +62,18 @@ class PracticeSessionRepository:
                 .first()
             )
             if not session:
-                logger.warning(f"Active session {session_id} not found for user {user_id}")
+                logger.warning("Active session %s not found for user %s", session_id, user_id)
                 raise HTTPException(status_code=404, detail="Active session not found")
             return session
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Error fetching active session {session_id} for user {user_id}: {str(e)}")
+            logger.error(
+                "Error fetching active session %s for user %s: %s",
+                session_id,
+                user_id,
+                str(e),
+            )
             raise HTTPException(status_code=500, detail="Internal server error while fetching session")
 
     def close(self, session: PracticeSessionModel):
@@ -73,5 +83,5 @@ class PracticeSessionRepository:
             self.db.commit()
         except Exception as e:
             self.db.rollback()
-            logger.error(f"Error closing session {session.id}: {str(e)}")
+            logger.error("Error closing session %s: %s", session.id, str(e))
             raise HTTPException(status_code=500, detail="Could not close session")
@@ -24,7 +24,12 @@ class QuestionRepository:
                 .all()
             )
         except Exception as e:
-            logger.error(f"Error fetching random questions for topic {topic_id}, difficulty {difficulty}: {str(e)}")
+            logger.error(
+                "Error fetching random questions for topic %s, difficulty %s: %s",
+                topic_id,
+                difficulty,
+                str(e),
+            )
             raise HTTPException(status_code=500, detail="Error fetching questions")
 
     def get_option(self, option_id: int) -> OptionModel:
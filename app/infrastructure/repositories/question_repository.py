@@ -1,10 +1,21 @@
 from typing import List, Optional
 import logging
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, lambda_stmt, select
+from sqlalchemy.orm import Session, contains_eager, joinedload, undefer_group
+from ..cache import TTLCache
+from ..db.filters import in_values
 from ..db.models import Question, Template, Concept, UserResponse
 
 logger = logging.getLogger(__name__)
 
+# topic_id -> candidate template ids. Templates/concepts change rarely; the
+# admin repositories clear this on writes and the TTL covers other workers.
+_candidate_template_ids = TTLCache(maxsize=1024, ttl=300)
+
+
+def invalidate_candidate_templates() -> None:
+    _candidate_template_ids.clear()
+
 
 class QuestionRepository:
     def __init__(self, db: Session):
@@ -14,99 +25,154 @@ class QuestionRepository:
         """
         Fetch templates filtered by topic (via Concept).
         """
-        logger.info(f"Fetching candidate templates for topic_id={topic_id}")
+        logger.info("Fetching candidate templates for topic_id=%s", topic_id)
+        template_ids = _candidate_template_ids.get(topic_id)
+        if template_ids is not None:
+            return self._get_templates_by_ids(template_ids)
+
+        # Populate template.concept from the join that's already there
         templates = (
             self.db.query(Template)
             .join(Concept, Template.concept_id == Concept.concept_id)
+            .options(contains_eager(Template.concept))
             .filter(Concept.topic_id == topic_id)
             .all()
         )
-        logger.info(f"Found {len(templates)} candidate templates for topic_id={topic_id}")
+        logger.info("Found %s candidate templates for topic_id=%s", len(templates), topic_id)
+        _candidate_template_ids.set(topic_id, [t.template_id for t in templates])
         return templates
 
+    def _get_templates_by_ids(self, template_ids: List[int]) -> List[Template]:
+        """
+        Materialize cached template ids, in order. Instances already in the
+        identity map are reused; the rest come back in one PK IN query.
+        """
+        identity_map = self.db.identity_map
+        found = {}
+        missing = []
+        for template_id in template_ids:
+            template = identity_map.get(self.db.identity_key(Template, template_id))
+            if template is None:
+                missing.append(template_id)
+            else:
+                found[template_id] = template
+
+        if missing:
+            loaded = (
+                self.db.query(Template)
+                .options(joinedload(Template.concept))
+                .filter(in_values(Template.template_id, missing))
+                .all()
+            )
+            found.update((t.template_id, t) for t in loaded)
+
+        # Ids deleted since caching simply drop out
+        return [found[tid] for tid in template_ids if tid in found]
+
     def get_cached_question(self, template_id: int) -> Optional[Question]:
-        logger.debug(f"Looking for cached question for template_id={template_id}")
-        question = (
-            self.db.query(Question)
-            .filter(Question.template_id == template_id)
-            .first()
+        logger.debug("Looking for cached question for template_id=%s", template_id)
+        # lambda_stmt: the statement is built and compiled once, then reused
+        # from the cache with only template_id re-bound
+        stmt = lambda_stmt(
+            lambda: select(Question).where(Question.template_id == template_id).limit(1)
         )
+        question = self.db.execute(stmt).scalars().first()
         if question:
-            logger.info(f"Cache hit: Found question_id={question.question_id} for template_id={template_id}")
+            logger.info(
+                "Cache hit: Found question_id=%s for template_id=%s",
+                question.question_id,
+                template_id,
+            )
         else:
-            logger.info(f"Cache miss: No cached question for template_id={template_id}")
+            logger.info("Cache miss: No cached question for template_id=%s", template_id)
         return question
 
     def get_unanswered_question(self, template_id: int, user_id: int) -> Optional[Question]:
         """
         Returns a question for the given template that the user hasn't answered yet.
         """
-        logger.debug(f"Looking for unanswered question for template_id={template_id}, user_id={user_id}")
-        from sqlalchemy import exists
-        
-        # Check if a response exists for a given question and user
-        stmt = exists().where(
-            UserResponse.question_id == Question.question_id
-        ).where(
-            UserResponse.user_id == user_id
+        logger.debug(
+            "Looking for unanswered question for template_id=%s, user_id=%s",
+            template_id,
+            user_id,
         )
-        
+        # Anti-join: the uq_user_question_response unique index on
+        # (user_id, question_id) serves the probe, and LIMIT 1 stops at the
+        # first question without a response.
         question = (
             self.db.query(Question)
-            .filter(Question.template_id == template_id)
-            .filter(~stmt)
+            .outerjoin(
+                UserResponse,
+                and_(
+                    UserResponse.question_id == Question.question_id,
+                    UserResponse.user_id == user_id,
+                ),
+            )
+            .filter(
+                Question.template_id == template_id,
+                UserResponse.response_id.is_(None),
+            )
+            .limit(1)
             .first()
         )
         
         if question:
-            logger.info(f"Found unanswered question_id={question.question_id} for template_id={template_id}, user_id={user_id}")
+            logger.info(
+                "Found unanswered question_id=%s for template_id=%s, user_id=%s",
+                question.question_id,
+                template_id,
+                user_id,
+            )
         else:
-            logger.info(f"No unanswered question found for template_id={template_id}, user_id={user_id}")
+            logger.info(
+                "No unanswered question found for template_id=%s, user_id=%s",
+                template_id,
+                user_id,
+            )
         return question
 
+    # PK lookups go through Session.get: an instance already in the identity
+    # map is returned without SQL, otherwise it's a plain PK SELECT.
     def get_by_id(self, question_id: int) -> Optional[Question]:
-        logger.debug(f"Fetching question by question_id={question_id}")
-        question = (
-            self.db.query(Question)
-            .filter(Question.question_id == question_id)
-            .first()
-        )
+        logger.debug("Fetching question by question_id=%s", question_id)
+        question = self.db.get(Question, question_id)
         if question:
-            logger.debug(f"Found question_id={question_id}")
+            logger.debug("Found question_id=%s", question_id)
         else:
-            logger.warning(f"Question not found: question_id={question_id}")
+            logger.warning("Question not found: question_id=%s", question_id)
         return question
 
     def get_concept(self, concept_id: int) -> Optional[Concept]:
-        logger.debug(f"Fetching concept by concept_id={concept_id}")
-        concept = (
-            self.db.query(Concept)
-            .filter(Concept.concept_id == concept_id)
-            .first()
-        )
+        logger.debug("Fetching concept by concept_id=%s", concept_id)
+        concept = self.db.get(Concept, concept_id)
         if concept:
-            logger.debug(f"Found concept_id={concept_id}")
+            logger.debug("Found concept_id=%s", concept_id)
         else:
-            logger.warning(f"Concept not found: concept_id={concept_id}")
+            logger.warning("Concept not found: concept_id=%s", concept_id)
         return concept
     
     def get_template(self, template_id: int) -> Optional[Template]:
-        logger.debug(f"Fetching template by template_id={template_id}")
-        template = (
-            self.db.query(Template)
-            .filter(Template.template_id == template_id)
-            .first()
-        )
+        logger.debug("Fetching template by template_id=%s", template_id)
+        # Callers read misconception_patterns; fetch the content group with the row
+        template = self.db.get(Template, template_id, options=[undefer_group("content")])
         if template:
-            logger.debug(f"Found template_id={template_id}")
+            logger.debug("Found template_id=%s", template_id)
         else:
-            logger.warning(f"Template not found: template_id={template_id}")
+            logger.warning("Template not found: template_id=%s", template_id)
         return template
 
     def save_question(self, question: Question) -> Question:
-        logger.info(f"Saving new question for template_id={question.template_id}")
+        logger.info("Saving new question for template_id=%s", question.template_id)
         self.db.add(question)
+        self.db.flush()
+        # Every column is client-side except question_id, which the flush just
+        # assigned. Detached, the instance keeps those values through commit
+        # instead of being expired and re-SELECTed on first access.
+        self.db.expunge(question)
         self.db.commit()
-        self.db.refresh(question)
-        logger.info(f"Successfully saved question_id={question.question_id} for template_id={question.template_id}")
+        logger.info(
+            "Successfully saved question_id=%s for template_id=%s",
+            question.question_id,
+            question.template_id,
+        )
         return question
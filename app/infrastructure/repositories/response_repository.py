@@ -1,6 +1,10 @@
-from typing import List, Dict, Optional
-from sqlalchemy.orm import Session
-from ..db.models import UserResponse, BanditStats, Question
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, load_only
+from ..db.models import UserResponse, BanditStats, Question, Template
 
 class ResponseRepository:
     def __init__(self, db: Session):
@@ -9,22 +13,39 @@ class ResponseRepository:
     def store_response(self, response: UserResponse) -> UserResponse:
         self.db.add(response)
         self.db.commit()
-        self.db.refresh(response)
+        # No refresh: the engine never reads the stored row back
         return response
 
     def get_response(self, user_id: int, question_id: int) -> Optional[UserResponse]:
-        return (
-            self.db.query(UserResponse)
-            .filter(
+        # Hot path: lambda_stmt caches the constructed statement, so calls
+        # only re-bind user_id/question_id
+        stmt = lambda_stmt(
+            lambda: select(UserResponse).where(
                 UserResponse.user_id == user_id,
                 UserResponse.question_id == question_id,
             )
-            .first()
         )
+        return self.db.execute(stmt).scalars().first()
 
-    def get_recent_responses(self, user_id: int, limit: int = 20) -> List[UserResponse]:
+    def get_recent_responses(
+        self,
+        user_id: int,
+        limit: int = 20,
+    ) -> List[UserResponse]:
+        """
+        Latest responses first, loading only the columns the user-state and
+        history code reads. Ordered LIMIT served by ix_user_responses_user_time.
+        """
         return (
             self.db.query(UserResponse)
+            .options(
+                load_only(
+                    UserResponse.correct,
+                    UserResponse.response_time,
+                    UserResponse.question_id,
+                    UserResponse.timestamp,
+                )
+            )
             .filter(UserResponse.user_id == user_id)
             .order_by(UserResponse.timestamp.desc())
             .limit(limit)
@@ -40,27 +61,15 @@ class ResponseRepository:
         Template's target_difficulty and use reasonable defaults for the other
         parameters.
         """
-        rows = (
-            self.db.query(UserResponse)
-            .filter(UserResponse.user_id == user_id)
-            .all()
-        )
-
         history: List[Dict] = []
-        for r in rows:
-            question = r.question
-            template = question.template if question is not None else None
-            base_difficulty = (
-                template.target_difficulty
-                if template is not None and template.target_difficulty is not None
-                else 0.5
-            )
+        for correct, target_difficulty in self._irt_rows(user_id):
+            base_difficulty = target_difficulty if target_difficulty is not None else 0.5
             # Map [0,1] difficulty onto a rough [-3,3] IRT difficulty scale
             irt_difficulty = (base_difficulty - 0.5) * 6.0
 
             history.append(
                 {
-                    "correct": r.correct,
+                    "correct": correct,
                     "difficulty": irt_difficulty,
                     "discrimination": 1.0,
                     "guessing": 0.25,
@@ -69,15 +78,42 @@ class ResponseRepository:
 
         return history
 
-    def get_bandit_stats(self, user_id: int) -> Dict[int, Dict[str, float]]:
-        stats = (
-            self.db.query(BanditStats)
-            .filter(BanditStats.user_id == user_id)
+    def get_irt_arrays(self, user_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Columnar form of get_irt_responses: (correct, difficulty) arrays.
+        Discrimination and guessing are the constant defaults (1.0 / 0.25).
+        """
+        rows = self._irt_rows(user_id)
+        n = len(rows)
+        correct = np.fromiter((bool(c) for c, _ in rows), dtype=bool, count=n)
+        base = np.fromiter(
+            (d if d is not None else 0.5 for _, d in rows), dtype=np.float64, count=n
+        )
+        return correct, (base - 0.5) * 6.0
+
+    def _irt_rows(self, user_id: int) -> List[Tuple[Optional[bool], Optional[float]]]:
+        """(correct, template target_difficulty) per response, in one query."""
+        # Outer joins keep responses whose question/template is missing;
+        # those fall back to the default difficulty like before.
+        return (
+            self.db.query(UserResponse.correct, Template.target_difficulty)
+            .outerjoin(Question, UserResponse.question_id == Question.question_id)
+            .outerjoin(Template, Question.template_id == Template.template_id)
+            .filter(UserResponse.user_id == user_id)
             .all()
         )
+
+    def get_bandit_stats(self, user_id: int) -> Dict[int, Dict[str, float]]:
+        # Plain column rows: no ORM hydration or identity-map bookkeeping
+        stmt = lambda_stmt(
+            lambda: select(
+                BanditStats.template_id, BanditStats.alpha, BanditStats.beta
+            ).where(BanditStats.user_id == user_id)
+        )
+        rows = self.db.execute(stmt).all()
         return {
-            s.template_id: {"alpha": s.alpha, "beta": s.beta}
-            for s in stats
+            template_id: {"alpha": alpha, "beta": beta}
+            for template_id, alpha, beta in rows
         }
 
     def update_bandit_stats(
@@ -87,25 +123,22 @@ class ResponseRepository:
         alpha: float,
         beta: float,
     ) -> None:
-        stat = (
-            self.db.query(BanditStats)
-            .filter(
-                BanditStats.user_id == user_id,
-                BanditStats.template_id == template_id,
-            )
-            .first()
+        # Single-statement upsert on uq_user_template_bandit_stats: no prior
+        # SELECT and no duplicate-key race between concurrent answers.
+        stmt = pg_insert(BanditStats).values(
+            user_id=user_id,
+            template_id=template_id,
+            alpha=alpha,
+            beta=beta,
         )
-
-        if not stat:
-            stat = BanditStats(
-                user_id=user_id,
-                template_id=template_id,
-                alpha=alpha,
-                beta=beta,
-            )
-            self.db.add(stat)
-        else:
-            stat.alpha = alpha
-            stat.beta = beta
-        
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[BanditStats.user_id, BanditStats.template_id],
+            set_={
+                "alpha": stmt.excluded.alpha,
+                "beta": stmt.excluded.beta,
+                # Column onupdate doesn't fire for ON CONFLICT DO UPDATE
+                "last_updated": datetime.utcnow(),
+            },
+        )
+        self.db.execute(stmt)
         self.db.commit()
@@ -1,3 +1,5 @@
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from infrastructure.db.models.subject_model import PracticeSubject
@@ -5,65 +7,91 @@ from presentation.schemas.subject_schema import (
     PracticeSubjectCreate,
     PracticeSubjectOut,
 )
+from infrastructure.cache import TTLCache
+from infrastructure.repositories.mcq_repo_impl import invalidate_topic_mcqs
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Subjects are read on nearly every admin page and rarely change
+SUBJECTS_KEY = "subjects:all"
+SUBJECT_KEY = "subject:{}"
+_subject_cache = TTLCache(maxsize=256, ttl=600)
+
+
+def _invalidate_subject(subject_id: int) -> None:
+    _subject_cache.invalidate(SUBJECTS_KEY)
+    _subject_cache.invalidate(SUBJECT_KEY.format(subject_id))
+
 
 def create_practice_subject(
     db: Session, subject_data: PracticeSubjectCreate
 ) -> PracticeSubjectOut:
     """Create a new practice subject"""
     try:
-        # Check if subject already exists
-        existing = (
-            db.query(PracticeSubject)
-            .filter(PracticeSubject.name == subject_data.name)
-            .first()
+        # Insert and existence check in one statement; the unique index on
+        # name decides, so concurrent creates can't both succeed
+        stmt = (
+            pg_insert(PracticeSubject)
+            .values(name=subject_data.name, description=subject_data.description)
+            .on_conflict_do_nothing(index_elements=[PracticeSubject.name])
+            .returning(
+                PracticeSubject.id, PracticeSubject.name, PracticeSubject.description
+            )
         )
+        row = db.execute(stmt).first()
 
-        if existing:
-            logger.warning(
-                f"Attempt to create duplicate practice subject: {subject_data.name}"
-            )
+        if row is None:
+            db.rollback()
+            logger.warning("Attempt to create duplicate practice subject: %s", subject_data.name)
             raise ValueError(f"Practice subject '{subject_data.name}' already exists")
 
-        subject = PracticeSubject(
-            name=subject_data.name, description=subject_data.description
-        )
-        db.add(subject)
         db.commit()
-        db.refresh(subject)
-        logger.info(f"Created practice subject: {subject.name} (ID: {subject.id})")
-        logger.info(f"this is the data : {subject}")
-        return PracticeSubjectOut.from_orm(subject)
+        subject = PracticeSubjectOut(
+            id=row.id, name=row.name, description=row.description
+        )
+        _invalidate_subject(subject.id)
+        logger.info("Created practice subject: %s (ID: %s)", subject.name, subject.id)
+        logger.info("this is the data : %s", subject)
+        return subject
 
     except IntegrityError as e:
         db.rollback()
-        logger.error(f"Database integrity error creating practice subject: {e}")
+        logger.error("Database integrity error creating practice subject: %s", e)
         raise ValueError(f"Database error: {str(e)}")
+    except ValueError:
+        raise
     except Exception as e:
         db.rollback()
-        logger.error(f"Unexpected error creating practice subject: {e}", exc_info=True)
+        logger.error("Unexpected error creating practice subject: %s", e, exc_info=True)
         raise
 
 
 def get_all_practice_subjects(db: Session):
     """Get all practice subjects"""
     try:
+        cached = _subject_cache.get(SUBJECTS_KEY)
+        if cached is not None:
+            return cached
+
         subjects = db.query(PracticeSubject).order_by(PracticeSubject.name).all()
-        logger.info(f"Retrieved {len(subjects)} practice subjects")
-        return [PracticeSubjectOut.from_orm(subject) for subject in subjects]
+        logger.info("Retrieved %s practice subjects", len(subjects))
+        result = [PracticeSubjectOut.from_orm(subject) for subject in subjects]
+        _subject_cache.set(SUBJECTS_KEY, result)
+        return result
     except Exception as e:
-        logger.error(f"Error fetching practice subjects: {e}", exc_info=True)
+        logger.error("Error fetching practice subjects: %s", e, exc_info=True)
         raise
 
 
 def _get_subject_model(db: Session, subject_id: int) -> PracticeSubject:
     """Internal helper to get the SQLAlchemy model instance"""
-    subject = db.query(PracticeSubject).filter(PracticeSubject.id == subject_id).first()
+    stmt = lambda_stmt(
+        lambda: select(PracticeSubject).where(PracticeSubject.id == subject_id)
+    )
+    subject = db.execute(stmt).scalars().first()
     if not subject:
-        logger.warning(f"Practice subject with id {subject_id} not found")
+        logger.warning("Practice subject with id %s not found", subject_id)
         raise ValueError(f"Practice subject with id {subject_id} not found")
     return subject
 
@@ -71,19 +99,24 @@ def _get_subject_model(db: Session, subject_id: int) -> PracticeSubject:
 def get_practice_subject_by_id(db: Session, subject_id: int):
     """Get a specific practice subject by ID"""
     try:
+        key = SUBJECT_KEY.format(subject_id)
+        cached = _subject_cache.get(key)
+        if cached is not None:
+            return cached
+
         subject = _get_subject_model(db, subject_id)
-        logger.info(f"Retrieved practice subject: {subject.name} (ID: {subject_id})")
-        return (
+        logger.info("Retrieved practice subject: %s (ID: %s)", subject.name, subject_id)
+        result = (
             PracticeSubjectOut.from_attribute(subject)
             if hasattr(PracticeSubjectOut, "from_attribute")
             else PracticeSubjectOut.from_orm(subject)
         )
+        _subject_cache.set(key, result)
+        return result
     except ValueError:
         raise
     except Exception as e:
-        logger.error(
-            f"Error fetching practice subject {subject_id}: {e}", exc_info=True
-        )
+        logger.error("Error fetching practice subject %s: %s", subject_id, e, exc_info=True)
         raise
 
 
@@ -103,7 +136,9 @@ def update_practice_subject(
             )
             if existing:
                 logger.warning(
-                    f"Cannot update practice subject {subject_id}: name '{subject_data.name}' already exists"
+                    "Cannot update practice subject %s: name '%s' already exists",
+                    subject_id,
+                    subject_data.name,
                 )
                 raise ValueError(
                     f"Practice subject name '{subject_data.name}' already exists"
@@ -112,26 +147,27 @@ def update_practice_subject(
         subject.name = subject_data.name
         subject.description = subject_data.description
         db.commit()
-        db.refresh(subject)
-        logger.info(f"Updated practice subject: {subject.name} (ID: {subject_id})")
-        return (
-            PracticeSubjectOut.from_attribute(subject)
-            if hasattr(PracticeSubjectOut, "from_attribute")
-            else PracticeSubjectOut.from_orm(subject)
+        _invalidate_subject(subject_id)
+        logger.info("Updated practice subject: %s (ID: %s)", subject_data.name, subject_id)
+        # Everything in the response is known without reloading the row
+        return PracticeSubjectOut(
+            id=subject_id,
+            name=subject_data.name,
+            description=subject_data.description,
         )
 
     except IntegrityError as e:
         db.rollback()
-        logger.error(
-            f"Database integrity error updating practice subject {subject_id}: {e}"
-        )
+        logger.error("Database integrity error updating practice subject %s: %s", subject_id, e)
         raise ValueError(f"Database error: {str(e)}")
     except ValueError:
         raise
     except Exception as e:
         db.rollback()
         logger.error(
-            f"Unexpected error updating practice subject {subject_id}: {e}",
+            "Unexpected error updating practice subject %s: %s",
+            subject_id,
+            e,
             exc_info=True,
         )
         raise
@@ -145,12 +181,15 @@ def delete_practice_subject(db: Session, subject_id: int):
         subject_name = subject.name
         db.delete(subject)
         db.commit()
-        logger.info(f"Deleted practice subject: {subject_name} (ID: {subject_id})")
+        _invalidate_subject(subject_id)
+        # Topics cascade with the subject; their ids aren't at hand, so drop all
+        invalidate_topic_mcqs()
+        logger.info("Deleted practice subject: %s (ID: %s)", subject_name, subject_id)
         return {"message": f"Practice subject '{subject_name}' deleted successfully"}
 
     except IntegrityError as e:
         db.rollback()
-        logger.error(f"Cannot delete practice subject {subject_id}: {e}")
+        logger.error("Cannot delete practice subject %s: %s", subject_id, e)
         raise ValueError(
             f"Cannot delete practice subject: it has associated topics, MCQs, or notes"
         )
@@ -159,7 +198,9 @@ def delete_practice_subject(db: Session, subject_id: int):
     except Exception as e:
         db.rollback()
         logger.error(
-            f"Unexpected error deleting practice subject {subject_id}: {e}",
+            "Unexpected error deleting practice subject %s: %s",
+            subject_id,
+            e,
             exc_info=True,
         )
         raise
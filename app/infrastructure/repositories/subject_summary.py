@@ -36,7 +36,7 @@
 #             .group_by(PracticeSubject.id)
 #         )
 
-from sqlalchemy import func, case, literal_column
+from sqlalchemy import Integer, bindparam, func, select
 from sqlalchemy.orm import Session
 from sqlalchemy.orm import aliased
 
@@ -51,109 +51,168 @@ from ..db.models.mock_test_session import (
     MockTestSessionModel,
 )
 from ..db.models.subject_model import MockTestSubject
+from ..cache import TTLCache
 
 from typing import List
 
 
-class SubjectSummaryRepository:
+# Plain Core tables: the summary is an aggregate report, so rows skip the
+# ORM entirely and come back as mappings.
+_subjects = PracticeSubject.__table__
+_topics = Topic.__table__
+_mcqs = PracticeMCQ.__table__
+_attempts = AttemptModel.__table__
+_mock_subjects = MockTestSubject.__table__
+_mock_mcqs = MockTestMCQ.__table__
+_answers = MockTestSessionAnswerModel.__table__
+_sessions = MockTestSessionModel.__table__
+_options = MockTestOption.__table__
+
+# Both statements are built once at import; only :user_id changes between
+# calls, so every execution reuses the same compiled SQL from the cache.
+_USER_ID = bindparam("user_id", type_=Integer)
+
+# ==========================
+# PRACTICE QUERY
+# ==========================
+
+# Question totals and this user's attempt totals are aggregated per subject
+# separately, then joined 1:1 on subject id. Attempts never multiply MCQ
+# rows, so the question count needs no DISTINCT.
+_practice_questions = (
+    select(
+        _topics.c.subject_id,
+        func.count(_mcqs.c.id).label("total_questions"),
+    )
+    .select_from(_topics.join(_mcqs, _mcqs.c.topic_id == _topics.c.id))
+    .group_by(_topics.c.subject_id)
+    .subquery()
+)
 
-    def __init__(self, db: Session):
-        self.db = db
+_practice_attempts = (
+    select(
+        _topics.c.subject_id,
+        func.count(_attempts.c.id).label("total_attempted"),
+        func.count(_attempts.c.id)
+        .filter(_attempts.c.is_correct == True)
+        .label("total_correct"),
+    )
+    .select_from(
+        _attempts.join(_mcqs, _mcqs.c.id == _attempts.c.mcq_id).join(
+            _topics, _topics.c.id == _mcqs.c.topic_id
+        )
+    )
+    .where(_attempts.c.user_id == _USER_ID)
+    .group_by(_topics.c.subject_id)
+    .subquery()
+)
 
-    def fetch_subject_summary(self, user_id: int):
+_PRACTICE_SUMMARY_STMT = (
+    select(
+        _subjects.c.name.label("subject_name"),
+        func.coalesce(_practice_questions.c.total_questions, 0).label("total_questions"),
+        func.coalesce(_practice_attempts.c.total_attempted, 0).label("total_attempted"),
+        func.coalesce(_practice_attempts.c.total_correct, 0).label("total_correct"),
+    )
+    .outerjoin(_practice_questions, _practice_questions.c.subject_id == _subjects.c.id)
+    .outerjoin(_practice_attempts, _practice_attempts.c.subject_id == _subjects.c.id)
+)
 
-        # ==========================
-        # PRACTICE QUERY
-        # ==========================
+# ==========================
+# MOCK TEST QUERY
+# ==========================
+
+_mock_questions = (
+    select(
+        _mock_mcqs.c.subject_id,
+        func.count(_mock_mcqs.c.id).label("total_questions"),
+    )
+    .group_by(_mock_mcqs.c.subject_id)
+    .subquery()
+)
 
-        practice_correct_case = func.sum(
-            case((AttemptModel.is_correct == True, 1), else_=0)
+# Only answers from this user's sessions are aggregated
+_mock_answers = (
+    select(
+        _mock_mcqs.c.subject_id,
+        func.count(_answers.c.id).label("total_attempted"),
+        func.count(_answers.c.id)
+        .filter(_options.c.is_correct == True)
+        .label("total_correct"),
+    )
+    .select_from(
+        _answers.join(
+            _sessions,
+            (_sessions.c.id == _answers.c.session_id) & (_sessions.c.user_id == _USER_ID),
         )
+        .join(_mock_mcqs, _mock_mcqs.c.id == _answers.c.mcq_id)
+        .outerjoin(_options, _options.c.id == _answers.c.selected_option_id)
+    )
+    .group_by(_mock_mcqs.c.subject_id)
+    .subquery()
+)
 
-        practice_query = (
-            self.db.query(
-                PracticeSubject.name.label("subject_name"),
-                func.count(func.distinct(PracticeMCQ.id)).label("total_questions"),
-                func.count(AttemptModel.id).label("total_attempted"),
-                func.coalesce(practice_correct_case, 0).label("total_correct"),
-            )
-            .outerjoin(Topic, Topic.subject_id == PracticeSubject.id)
-            .outerjoin(PracticeMCQ, PracticeMCQ.topic_id == Topic.id)
-            .outerjoin(
-                AttemptModel,
-                (AttemptModel.mcq_id == PracticeMCQ.id)
-                & (AttemptModel.user_id == user_id),
-            )
-            .group_by(PracticeSubject.name)
-        )
+# Mock subject names repeat across mock tests; rows are per subject and
+# the merge below adds up equal names
+_MOCK_SUMMARY_STMT = (
+    select(
+        _mock_subjects.c.name.label("subject_name"),
+        func.coalesce(_mock_questions.c.total_questions, 0).label("total_questions"),
+        func.coalesce(_mock_answers.c.total_attempted, 0).label("total_attempted"),
+        func.coalesce(_mock_answers.c.total_correct, 0).label("total_correct"),
+    )
+    .outerjoin(_mock_questions, _mock_questions.c.subject_id == _mock_subjects.c.id)
+    .outerjoin(_mock_answers, _mock_answers.c.subject_id == _mock_subjects.c.id)
+)
 
-        # ==========================
-        # MOCK TEST QUERY
-        # ==========================
+# user_id -> summary rows. Counts move with every answer, so the TTL is short
+# and the attempt/answer writers drop the user's entry.
+_summary_cache = TTLCache(maxsize=4096, ttl=30)
 
 
-        mock_attempted_case = func.sum(
-            case(((MockTestSessionModel.user_id == user_id), 1), else_=0)
-        )
+def invalidate_subject_summary(user_id: int) -> None:
+    _summary_cache.invalidate(user_id)
 
-        mock_correct_case = func.sum(
-            case(
-                (
-                    (MockTestSessionModel.user_id == user_id)
-                    & (MockTestOption.is_correct == True),
-                    1,
-                ),
-                else_=0,
-            )
-        )
 
-        mock_query = (
-            self.db.query(
-                MockTestSubject.name.label("subject_name"),
-                func.count(func.distinct(MockTestMCQ.id)).label("total_questions"),
-                func.coalesce(mock_attempted_case, 0).label("total_attempted"),
-                func.coalesce(mock_correct_case, 0).label("total_correct"),
-            )
-            .outerjoin(MockTestMCQ, MockTestMCQ.subject_id == MockTestSubject.id)
-            .outerjoin(
-                MockTestSessionAnswerModel,
-                MockTestSessionAnswerModel.mcq_id == MockTestMCQ.id,
-            )
-            .outerjoin(
-                MockTestSessionModel,
-                (MockTestSessionModel.id == MockTestSessionAnswerModel.session_id),
-            )
-            .outerjoin(
-                MockTestOption,
-                MockTestOption.id == MockTestSessionAnswerModel.selected_option_id,
-            )
-            .group_by(MockTestSubject.name)
-        )
+class SubjectSummaryRepository:
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def fetch_subject_summary(self, user_id: int):
+        cached = _summary_cache.get(user_id)
+        if cached is not None:
+            return cached
+
+        # Core execution on the session's connection: no ORM result
+        # processing for what are four scalar columns per row
+        conn = self.db.connection()
+        params = {"user_id": user_id}
+        practice_rows = conn.execute(_PRACTICE_SUMMARY_STMT, params).mappings().all()
+        mock_rows = conn.execute(_MOCK_SUMMARY_STMT, params).mappings().all()
 
         # ==========================
-        # UNION BOTH
+        # MERGE BOTH
         # ==========================
 
-        union_query = practice_query.union_all(mock_query).subquery()
-
-        final_query = self.db.query(
-            union_query.c.subject_name,
-            func.sum(union_query.c.total_questions).label("total_questions"),
-            func.sum(union_query.c.total_attempted).label("total_attempted"),
-            func.sum(union_query.c.total_correct).label("total_correct"),
-        ).group_by(union_query.c.subject_name)
-
-        results = final_query.all()
-
-        return [
-            {
-                "subject_name": row.subject_name,
-                "total_questions": int(row.total_questions or 0),
-                "total_attempted": int(row.total_attempted or 0),
-                "total_correct": int(row.total_correct or 0),
-            }
-            for row in results
-        ]
+        # Each query returns one row per subject, so the only work left is
+        # adding up names present more than once; the result is one row per
+        # subject, cheaper to merge here than with another pass in SQL
+        # Counts are COALESCEd in SQL and come back as ints, so rows are
+        # added up and returned without any per-field coercion
+        totals = {}
+        for row in practice_rows + mock_rows:
+            entry = totals.get(row["subject_name"])
+            if entry is None:
+                totals[row["subject_name"]] = dict(row)
+            else:
+                entry["total_questions"] += row["total_questions"]
+                entry["total_attempted"] += row["total_attempted"]
+                entry["total_correct"] += row["total_correct"]
+
+        result = list(totals.values())
+        _summary_cache.set(user_id, result)
+        return result
 
 
 if __name__ == "__main__":
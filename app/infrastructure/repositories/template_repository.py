@@ -1,47 +1,72 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from typing import Iterator, List, Optional
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session, contains_eager, undefer_group
+from ..adaptive_system.question_generation import invalidate_prompt_caches
 from ..db.models import Template
+from .question_repository import invalidate_candidate_templates
+
+_templates = Template.__table__
 
 class TemplateRepository:
     def __init__(self, db: Session):
         self.db = db
 
     def create_template(self, template_data) -> Template:
-        db_template = Template(
-            concept_id=template_data.concept_id,
-            intent=template_data.intent,
-            learning_objective=template_data.learning_objective,
-            target_difficulty=template_data.target_difficulty,
-            question_style=template_data.question_style,
-            correct_reasoning=template_data.correct_reasoning,
-            misconception_patterns=template_data.misconception_patterns,
-            answer_format=template_data.answer_format
-        )
-        self.db.add(db_template)
+        # Core INSERT ... RETURNING: server defaults (created_at) come back with
+        # the insert, so there's no unit-of-work flush and no refresh SELECT.
+        # The returned Template is transient, built from the inserted row.
+        row = self.db.execute(
+            insert(_templates)
+            .values(
+                concept_id=template_data.concept_id,
+                intent=template_data.intent,
+                learning_objective=template_data.learning_objective,
+                target_difficulty=template_data.target_difficulty,
+                question_style=template_data.question_style,
+                correct_reasoning=template_data.correct_reasoning,
+                misconception_patterns=template_data.misconception_patterns,
+                answer_format=template_data.answer_format,
+            )
+            .returning(*_templates.c)
+        ).one()
         self.db.commit()
-        self.db.refresh(db_template)
-        return db_template
+        invalidate_candidate_templates()
+        invalidate_prompt_caches()
+        return Template(**row._mapping)
 
     def get_by_id(self, template_id: int) -> Optional[Template]:
-        return self.db.query(Template).filter(Template.template_id == template_id).first()
+        # Session.get answers from the identity map when the template is already
+        # loaded in this session, otherwise it's a plain PK SELECT
+        return self.db.get(Template, template_id, options=[undefer_group("content")])
 
-    def get_all(self, concept_id: Optional[int] = None) -> List[Template]:
-        query = self.db.query(Template)
+    def get_all(self, concept_id: Optional[int] = None) -> Iterator[Template]:
+        # TemplateOut serializes the deferred content columns; load them up front
+        query = self.db.query(Template).options(undefer_group("content"))
         if concept_id:
             query = query.filter(Template.concept_id == concept_id)
-        return query.all()
+        # Server-side cursor, 500 rows at a time: the content columns are
+        # large, so the full listing is never held in memory at once.
+        # Callers that need a list can wrap this in list()
+        return iter(query.yield_per(500))
 
     def update_template(self, template_id: int, template_data) -> Optional[Template]:
-        db_template = self.get_by_id(template_id)
-        if not db_template:
+        values = template_data.dict(exclude_unset=True)
+        if not values:
+            return self.get_by_id(template_id)
+
+        row = self.db.execute(
+            update(_templates)
+            .where(_templates.c.template_id == template_id)
+            .values(**values)
+            .returning(*_templates.c)
+        ).first()
+        if row is None:
             return None
-        
-        for key, value in template_data.dict(exclude_unset=True).items():
-            setattr(db_template, key, value)
-        
+
         self.db.commit()
-        self.db.refresh(db_template)
-        return db_template
+        invalidate_candidate_templates()
+        invalidate_prompt_caches()
+        return Template(**row._mapping)
 
     def delete_template(self, template_id: int) -> bool:
         db_template = self.get_by_id(template_id)
@@ -49,16 +74,21 @@ class TemplateRepository:
             return False
         self.db.delete(db_template)
         self.db.commit()
+        invalidate_candidate_templates()
+        invalidate_prompt_caches()
         return True
 
     def get_candidate_templates(self, topic_id: int) -> List[Template]:
         """
         Returns templates for a topic by joining with concepts.
+        template.concept is populated from the join (no extra query); the
+        deferred content columns are loaded only for the template that's used.
         """
         from ..db.models import Concept
         return (
             self.db.query(Template)
             .join(Concept, Template.concept_id == Concept.concept_id)
+            .options(contains_eager(Template.concept))
             .filter(Concept.topic_id == topic_id)
             .all()
         )
@@ -1,83 +1,122 @@
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from infrastructure.db.models.topic_model import Topic
-from infrastructure.db.models.subject_model import PracticeSubject
-from presentation.schemas.topic_schema import TopicCreate,TopicOut
+from infrastructure.db.models.mcq_model import PracticeMCQ
+from presentation.schemas.topic_schema import TopicCreate,TopicOut,TopicWithCountOut
+from infrastructure.repositories.mcq_repo_impl import invalidate_topic_mcqs
 import logging
 
 logger = logging.getLogger(__name__)
 
+# PostgreSQL SQLSTATEs for integrity errors raised by single-statement writes
+FOREIGN_KEY_VIOLATION = "23503"
+UNIQUE_VIOLATION = "23505"
+
+TOPIC_NAME_CONSTRAINT = "uq_topic_name_subject_id"
+
 def create_topic(db: Session, subject_id: int, topic_data: TopicCreate) -> TopicOut:
     """Create a new topic"""
     try:
-        # Verify subject exists
-        subject = db.query(PracticeSubject).filter(PracticeSubject.id == subject_id).first()
-        if not subject:
-            logger.warning(f"Topic creation failed: Subject {subject_id} not found")
-            raise ValueError(f"Subject with ID {subject_id} does not exist.")
-
-        # Check if topic already exists for this subject
-        existing = db.query(Topic).filter(
-            Topic.name == topic_data.name,
-            Topic.subject_id == subject_id
-        ).first()
-        
-        if existing:
-            logger.warning(f"Attempt to create duplicate topic: {topic_data.name} for subject_id: {subject_id}")
-            raise ValueError(f"Topic '{topic_data.name}' already exists for this subject")
-        
-        # Calculate the next order_index for this subject
-        max_order = db.query(Topic).filter(
-            Topic.subject_id == subject_id
-        ).count()
-        
-        topic = Topic(
-            name=topic_data.name,
-            subject_id=subject_id,
-            order_index=max_order
+        # One statement: order_index is the subject's current topic count,
+        # uq_topic_name_subject_id rejects duplicates (no row returned) and the
+        # FK rejects unknown subjects
+        next_order = (
+            select(func.count(Topic.id))
+            .where(Topic.subject_id == subject_id)
+            .scalar_subquery()
         )
-        db.add(topic)
+        stmt = (
+            pg_insert(Topic)
+            .values(name=topic_data.name, subject_id=subject_id, order_index=next_order)
+            .on_conflict_do_nothing(index_elements=[Topic.name, Topic.subject_id])
+            .returning(Topic.id, Topic.name, Topic.subject_id, Topic.order_index)
+        )
+        row = db.execute(stmt).first()
+
+        if row is None:
+            db.rollback()
+            logger.warning(
+                "Attempt to create duplicate topic: %s for subject_id: %s",
+                topic_data.name,
+                subject_id,
+            )
+            raise ValueError(f"Topic '{topic_data.name}' already exists for this subject")
+
         db.commit()
-        db.refresh(topic)
-        logger.info(f"Created topic: {topic.name} (ID: {topic.id}) for subject_id: {subject_id} with order_index: {max_order}")
-        return TopicOut.from_orm(topic)
+        logger.info(
+            "Created topic: %s (ID: %s) for subject_id: %s with order_index: %s",
+            row.name,
+            row.id,
+            subject_id,
+            row.order_index,
+        )
+        return TopicOut(id=row.id, name=row.name, subject_id=row.subject_id)
     
     except IntegrityError as e:
         db.rollback()
-        logger.error(f"Database integrity error creating topic: {e}")
+        if getattr(e.orig, "pgcode", None) == FOREIGN_KEY_VIOLATION:
+            logger.warning("Topic creation failed: Subject %s not found", subject_id)
+            raise ValueError(f"Subject with ID {subject_id} does not exist.")
+        logger.error("Database integrity error creating topic: %s", e)
         raise ValueError(f"Invalid subject_id or database error: {str(e)}")
     except ValueError:
         raise
     except Exception as e:
         db.rollback()
-        logger.error(f"Unexpected error creating topic: {e}", exc_info=True)
+        logger.error("Unexpected error creating topic: %s", e, exc_info=True)
         raise
 
 def get_topics_by_subject(db: Session, subject_id: int):
     """Get all topics for a specific subject"""
     try:
         topics = db.query(Topic).filter(Topic.subject_id == subject_id).all()
-        logger.info(f"Retrieved {len(topics)} topics for subject_id: {subject_id}")
+        logger.info("Retrieved %s topics for subject_id: %s", len(topics), subject_id)
         return [TopicOut.from_orm(topic) for topic in topics]
     except Exception as e:
-        logger.error(f"Error fetching topics for subject_id {subject_id}: {e}", exc_info=True)
+        logger.error("Error fetching topics for subject_id %s: %s", subject_id, e, exc_info=True)
+        raise
+
+def get_topics_with_counts(db: Session, subject_id: int):
+    """Get a subject's topics with their MCQ counts in one grouped query"""
+    try:
+        rows = (
+            db.query(
+                Topic.id,
+                Topic.name,
+                Topic.subject_id,
+                func.count(PracticeMCQ.id).label("mcq_count"),
+            )
+            .outerjoin(PracticeMCQ, PracticeMCQ.topic_id == Topic.id)
+            .filter(Topic.subject_id == subject_id)
+            .group_by(Topic.id)
+            .order_by(Topic.order_index)
+            .all()
+        )
+        logger.info("Retrieved %s topics with counts for subject_id: %s", len(rows), subject_id)
+        return [TopicWithCountOut.model_validate(row) for row in rows]
+    except Exception as e:
+        logger.error(
+            "Error fetching topic counts for subject_id %s: %s", subject_id, e, exc_info=True
+        )
         raise
 
 def get_all_topics(db: Session):
     """Get all topics"""
     try:
         topics = db.query(Topic).all()
-        logger.info(f"Retrieved {len(topics)} topics")
+        logger.info("Retrieved %s topics", len(topics))
         return [TopicOut.from_orm(topic) for topic in topics]
     except Exception as e:
-        logger.error(f"Error fetching all topics: {e}", exc_info=True)
+        logger.error("Error fetching all topics: %s", e, exc_info=True)
         raise
 
 def _get_topic_model(db: Session, topic_id: int) -> Topic:
     """Internal helper to get the SQLAlchemy model instance"""
     topic = db.query(Topic).filter(Topic.id == topic_id).first()
     if not topic:
-        logger.warning(f"Topic with id {topic_id} not found")
+        logger.warning("Topic with id %s not found", topic_id)
         raise ValueError(f"Topic with id {topic_id} not found")
     return topic
 
@@ -86,54 +125,56 @@ def get_topic_by_id(db: Session, topic_id: int):
     """Get a specific topic by ID"""
     try:
         topic = _get_topic_model(db, topic_id)
-        logger.info(f"Retrieved topic: {topic.name} (ID: {topic_id})")
+        logger.info("Retrieved topic: %s (ID: %s)", topic.name, topic_id)
         return TopicOut.from_attribute(topic) if hasattr(TopicOut, "from_attribute") else TopicOut.from_orm(topic)
     except ValueError:
         raise
     except Exception as e:
-        logger.error(f"Error fetching topic {topic_id}: {e}", exc_info=True)
+        logger.error("Error fetching topic %s: %s", topic_id, e, exc_info=True)
         raise
 
 
 def update_topic(db: Session, topic_id: int, topic_data: TopicCreate) -> TopicOut:
     """Update a topic"""
     try:
-        topic = _get_topic_model(db, topic_id)
+        # One round trip: existence and the (name, subject_id) uniqueness are
+        # both enforced by the UPDATE itself
+        stmt = (
+            update(Topic)
+            .where(Topic.id == topic_id)
+            .values(name=topic_data.name)
+            .returning(Topic.id, Topic.name, Topic.subject_id)
+        )
+        row = db.execute(stmt).first()
+        if row is None:
+            db.rollback()
+            logger.warning("Topic with id %s not found", topic_id)
+            raise ValueError(f"Topic with id {topic_id} not found")
 
-        # Check if new name conflicts with existing topic for the same subject
-        if topic_data.name != topic.name and topic_data.subject_id != topic.subject_id:
-            existing = db.query(Topic).filter(
-                Topic.name == topic_data.name,
-                Topic.subject_id == topic_data.subject_id,
-                Topic.id != topic_id  # Exclude current topic
-            ).first()
-
-            if existing:
-                logger.warning(f"Cannot update topic {topic_id}: name '{topic_data.name}' already exists for subject_id {topic_data.subject_id}")
-                raise ValueError(f"Topic name '{topic_data.name}' already exists for this subject")
-
-        temp =  db.query(PracticeSubject).filter(PracticeSubject.id== topic_data.subject_id).first() 
-        if not temp:
-            logger.error("The subject id,you are trying to modify doesnot exist")
-            raise ValueError(f"Modifying process failed because subject id {topic_data.subject_id} does not exist")
-        
-        topic.name = topic_data.name
-        topic.subject_id = topic_data.subject_id
-        
         db.commit()
-        db.refresh(topic)
-        logger.info(f"Updated topic: {topic.name} (ID: {topic_id})")
-        return TopicOut.from_attribute(topic) if hasattr(TopicOut, "from_attribute") else TopicOut.from_orm(topic)
+        logger.info("Updated topic: %s (ID: %s)", row.name, topic_id)
+        return TopicOut(id=row.id, name=row.name, subject_id=row.subject_id)
 
     except IntegrityError as e:
         db.rollback()
-        logger.error(f"Database integrity error updating topic {topic_id}: {e}")
+        diag = getattr(e.orig, "diag", None)
+        if (
+            getattr(e.orig, "pgcode", None) == UNIQUE_VIOLATION
+            and getattr(diag, "constraint_name", None) == TOPIC_NAME_CONSTRAINT
+        ):
+            logger.warning(
+                "Cannot update topic %s: name '%s' already exists for its subject",
+                topic_id,
+                topic_data.name,
+            )
+            raise ValueError(f"Topic name '{topic_data.name}' already exists for this subject")
+        logger.error("Database integrity error updating topic %s: %s", topic_id, e)
         raise ValueError(f"Database error: {str(e)}")
     except ValueError:
         raise
     except Exception as e:
         db.rollback()
-        logger.error(f"Unexpected error updating topic {topic_id}: {e}", exc_info=True)
+        logger.error("Unexpected error updating topic %s: %s", topic_id, e, exc_info=True)
         raise
 
 
@@ -144,16 +185,17 @@ def delete_topic(db: Session, topic_id: int):
         topic_name = topic.name
         db.delete(topic)
         db.commit()
-        logger.info(f"Deleted topic: {topic_name} (ID: {topic_id})")
+        invalidate_topic_mcqs(topic_id)
+        logger.info("Deleted topic: %s (ID: %s)", topic_name, topic_id)
         return {"message": f"Topic '{topic_name}' deleted successfully"}
     
     except IntegrityError as e:
         db.rollback()
-        logger.error(f"Cannot delete topic {topic_id}: {e}")
+        logger.error("Cannot delete topic %s: %s", topic_id, e)
         raise ValueError(f"Cannot delete topic: it has associated MCQs")
     except ValueError:
         raise
     except Exception as e:
         db.rollback()
-        logger.error(f"Unexpected error deleting topic {topic_id}: {e}", exc_info=True)
+        logger.error("Unexpected error deleting topic %s: %s", topic_id, e, exc_info=True)
         raise
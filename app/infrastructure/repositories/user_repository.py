@@ -1,4 +1,5 @@
-from typing import Dict, List
+from typing import List, Tuple
+import numpy as np
 from sqlalchemy.orm import Session
 from ..db.models import UserModel, UserAbility, UserMastery
 
@@ -26,13 +27,17 @@ class UserRepository:
             self.db.add(UserAbility(user_id=user_id, global_ability=ability_val))
         self.db.commit()
 
-    def get_concept_mastery(self, user_id: int) -> Dict[int, float]:
+    def get_concept_mastery(self, user_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(concept_ids, mastery) as parallel arrays sorted by concept_id."""
         rows = (
-            self.db.query(UserMastery)
+            self.db.query(UserMastery.concept_id, UserMastery.mastery)
             .filter(UserMastery.user_id == user_id)
+            .order_by(UserMastery.concept_id)
             .all()
         )
-        return {row.concept_id: row.mastery for row in rows}
+        concept_ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        values = np.fromiter((r[1] for r in rows), dtype=np.float64, count=len(rows))
+        return concept_ids, values
 
     def update_concept_mastery(
         self,
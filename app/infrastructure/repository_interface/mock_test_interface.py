@@ -4,11 +4,16 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 
 class MockTestRepository(ABC):
+    __slots__ = ()
 
     @abstractmethod
     def get_mock_test_with_subjects(self, db: Session, mock_test_id: int):
         pass
 
+    @abstractmethod
+    def get_mock_test_question_ids(self, db: Session, mock_test_id: int):
+        pass
+
     @abstractmethod
     def create_session(
         self,
@@ -70,3 +75,7 @@ class MockTestRepository(ABC):
     @abstractmethod
     def get_session_by_id(self, db: Session, session_id: int):
         pass
+
+    @abstractmethod
+    def get_user_session_state(self, db: Session, session_id: int, user_id: int):
+        pass
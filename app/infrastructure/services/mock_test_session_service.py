@@ -6,10 +6,13 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from infrastructure.db.models.mock_test_session import MockTestSessionModel
 from infrastructure.repositories.mock_test_conc_repo import MockTestRepositoryImpl
+from infrastructure.repositories.subject_summary import invalidate_subject_summary
 
 logger = logging.getLogger(__name__)
 
 class MockTestSessionService:
+    __slots__ = ("db", "repo")
+
     SESSION_DURATION = timedelta(hours=2)
 
     def __init__(self, db: Session, repo: MockTestRepositoryImpl):
@@ -47,21 +50,15 @@ class MockTestSessionService:
 
             # Fix question order: subject-wise
             logger.info(f"Fetching mock test structure for ID {mock_test_id} to populate session questions")
-            mock_test = self.repo.get_mock_test_with_subjects(self.db, mock_test_id)
-            if not mock_test:
+            question_ids = self.repo.get_mock_test_question_ids(self.db, mock_test_id)
+            if question_ids is None:
                 logger.error(f"Mock test {mock_test_id} structure not found!")
                 raise ValueError(f"Mock test {mock_test_id} not found")
 
-            session_questions_data = []
-            order_index = 0
-            for subject in mock_test.subjects:
-                for mcq in subject.mcqs:
-                    session_questions_data.append({
-                        'mcq_id': mcq.id,
-                        'subject_id': subject.id,
-                        'order_index': order_index
-                    })
-                    order_index += 1
+            session_questions_data = [
+                {'mcq_id': mcq_id, 'subject_id': subject_id, 'order_index': order_index}
+                for order_index, (mcq_id, subject_id) in enumerate(question_ids)
+            ]
 
             if session_questions_data:
                 self.repo.add_session_questions(
@@ -138,6 +135,7 @@ class MockTestSessionService:
                 selected_option_id=selected_option_id,
             )
             # Repo handles commit
+            invalidate_subject_summary(user_id)
         except Exception as e:
             logger.error(f"Error saving answer for session {session_id}: {e}", exc_info=True)
             raise
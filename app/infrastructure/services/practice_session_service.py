@@ -126,8 +126,11 @@ class PracticeSessionService:
             )
             raise HTTPException(status_code=400, detail="Question mismatch")
 
-        # Validate option
-        selected_option = self.question_repo.get_option(selected_option_id)
+        # Validate option against this question's options, which are loaded
+        # with the MCQ: no extra query, and another question's option is rejected
+        selected_option = next(
+            (opt for opt in mcq.options if opt.id == selected_option_id), None
+        )
         if not selected_option:
             logger.warning(
                 f"Invalid option {selected_option_id} submitted for question {question_id}"
@@ -18,12 +18,23 @@ from presentation.schemas.mock_test_schema import (
 
 import logging
 import pandas as pd
-import io
 from pydantic import ValidationError
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/bulk-upload", tags=["bulk_uplod_mcqs"])
 
+
+_OPTION_KEYS = ("option1", "option2", "option3", "option4")
+
+
+def _cell_str(row: dict, key: str, default: str = "") -> str:
+    """Stripped string value of a parsed cell, or default when empty/NaN."""
+    val = row.get(key)
+    if pd.isna(val):
+        return default
+    val = str(val).strip()
+    return val if val else default
+
 @router.post("/practice", response_model=PracticeBulkUploadResponse)
 async def bulk_upload_practice(
     topic_id: int = Form(...),
@@ -36,10 +47,10 @@ async def bulk_upload_practice(
             f"Admin {admin['user_id']} bulk uploading practice MCQs for topic_id: {topic_id}"
         )
 
-        file_content = await file.read()
+        # Hand pandas the spooled upload file instead of a second in-memory copy
         repo = PracticeBulkRepository(db)
         return repo.process_bulk_upload(
-            file_content, file.filename, topic_id, admin["user_id"]
+            file.file, file.filename, topic_id, admin["user_id"]
         )
 
     except ValueError as e:
@@ -71,21 +82,19 @@ async def bulk_upload_mock_test(
             f"Admin {admin['user_id']} bulk uploading mock test: {mock_test_title}"
         )
 
-        # Read and parse file
-        file_content = await file.read()
-
+        # Parse straight from the spooled upload file
         # Parse based on file type
         if file.filename.endswith(".csv"):
             try:
                 df = pd.read_csv(
-                    io.BytesIO(file_content), on_bad_lines="skip", engine="python", keep_default_na=False
+                    file.file, on_bad_lines="skip", engine="python", keep_default_na=False
                 )
             except Exception as e:
                 logger.error(f"Error parsing CSV: {e}")
                 raise ValueError(f"Error parsing CSV file: {str(e)}")
         elif file.filename.endswith((".xlsx", ".xls")):
             try:
-                df = pd.read_excel(io.BytesIO(file_content), keep_default_na=False)
+                df = pd.read_excel(file.file, keep_default_na=False)
             except Exception as e:
                 logger.error(f"Error parsing Excel: {e}")
                 raise ValueError(f"Error parsing Excel file: {str(e)}")
@@ -127,28 +136,19 @@ async def bulk_upload_mock_test(
             # Prepare validated data for repository
             validated_questions = []
             for idx, q in enumerate(questions_data):
-                # Helper to get string safely
-                def get_str(key, default=""):
-                    val = q.get(key)
-                    if pd.isna(val) or str(val).strip() == "":
-                        return default
-                    return str(val).strip()
-
                 # Determine which option is correct
-                correct_val = get_str("correct_answer")
+                correct_val = _cell_str(q, "correct_answer")
                 
                 # First pass: collect all options and determine which one is correct
-                option_texts = []
-                for i in range(1, 4 + 1):
-                    opt_text = get_str(f"option{i}", default="None")
-                    option_texts.append(opt_text)
+                option_texts = [_cell_str(q, key, default="None") for key in _OPTION_KEYS]
                 
                 # Find the correct option index (0-based)
                 correct_index = None
                 
                 # Case 1: Exact text match (highest priority)
+                correct_lower = correct_val.lower()
                 for i, opt_text in enumerate(option_texts):
-                    if correct_val.lower() == opt_text.lower():
+                    if correct_lower == opt_text.lower():
                         correct_index = i
                         break
                 
@@ -187,12 +187,12 @@ async def bulk_upload_mock_test(
                     logger.warning(
                         f"DEBUG: Correct answer mismatch at Row {idx + 2}. "
                         f"Expected: '{correct_val}', Found matches: {correct_found_count}. "
-                        f"Options: [1: '{get_str('option1', 'None')}', 2: '{get_str('option2', 'None')}', 3: '{get_str('option3', 'None')}', 4: '{get_str('option4', 'None')}']"
+                        f"Options: [1: '{option_texts[0]}', 2: '{option_texts[1]}', 3: '{option_texts[2]}', 4: '{option_texts[3]}']"
                     )
                 
                 validated_questions.append(QuestionCreate(
-                    subject=get_str("subject"),
-                    question_text=get_str("question_text"),
+                    subject=_cell_str(q, "subject"),
+                    question_text=_cell_str(q, "question_text"),
                     options=options
                 ))
             
@@ -227,7 +227,8 @@ async def bulk_upload_mock_test(
             return MockTestOut(
                 id=mock_test.id,
                 title=mock_test.title,
-                total_questions=len(mock_test.questions),
+                # Known from the upload; avoids loading every linked MCQ to count them
+                total_questions=len(bulk_data.questions),
             )
         except ValidationError as e:
             logger.warning(f"Schema validation error: {e}")
@@ -23,9 +23,7 @@ def add_mcq(
     mcq: PracticeMCQCreate, db: Session = Depends(get_db)
 ):
     try:
-        logger.info(
-            f"creating MCQ for topic {topic_id}"
-        )
+        logger.info("creating MCQ for topic %s", topic_id)
         result = create_mcq(db, topic_id, mcq)
         return result
     except ValueError as e:
@@ -40,9 +38,7 @@ def get_mcqs(
     topic_id: int, db: Session = Depends(get_db)
 ):
     try:
-        logger.info(
-            f"getting MCQs for topic {topic_id}"
-        )
+        logger.info("getting MCQs for topic %s", topic_id)
         result = get_mcqs_by_topic_id(db, topic_id)
         return result
     except ValueError as e:
@@ -59,9 +55,7 @@ def update_mcq(
     db: Session = Depends(get_db)
 ):
     try:
-        logger.info(
-            f"updating MCQ {mcq_id}"
-        )
+        logger.info("updating MCQ %s", mcq_id)
         result = update_mcq_by_id(db, mcq_id, mcq)
         return result
     except ValueError as e:
@@ -77,9 +71,7 @@ def delete_mcq(
     db: Session = Depends(get_db)
 ):
     try:
-        logger.info(
-            f"deleting MCQ {mcq_id}"
-        )
+        logger.info("deleting MCQ %s", mcq_id)
         result = delete_mcq_by_id(db, mcq_id)
         return result
     except ValueError as e:
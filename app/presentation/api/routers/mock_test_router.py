@@ -8,6 +8,7 @@ from infrastructure.services.mock_test_session_service import MockTestSessionSer
 from infrastructure.repositories.mock_test_conc_repo import MockTestRepositoryImpl
 from presentation.schemas.mock_test_session_schema import (
     AnswerRequest,
+    OptionSchema,
     QuestionResponse,
     MockTestResultResponse,
     StartSessionResponse,
@@ -44,17 +45,21 @@ def start_session(
     """
     try:
         user_id = current_user.get("user_id")
-        logger.info(f"User {user_id} starting session for mock test {mock_test_id}")
+        logger.info("User %s starting session for mock test %s", user_id, mock_test_id)
         session = service.start_session(user_id, mock_test_id)
         return session
     except ValueError as e:
         logger.warning(
-            f"Validation error starting session for user {current_user.get('user_id')}: {e}"
+            "Validation error starting session for user %s: %s",
+            current_user.get('user_id'),
+            e,
         )
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(
-            f"Unexpected error starting session for user {current_user.get('user_id')}: {e}",
+            "Unexpected error starting session for user %s: %s",
+            current_user.get('user_id'),
+            e,
             exc_info=True,
         )
         raise HTTPException(
@@ -77,7 +82,7 @@ def get_questions(
     """
     try:
         user_id = current_user.get("user_id")
-        logger.info(f"User {user_id} fetching questions for session {session_id}")
+        logger.info("User %s fetching questions for session %s", user_id, session_id)
         questions = service.get_questions(session_id, user_id)
 
         response = []
@@ -87,28 +92,26 @@ def get_questions(
             # if getattr(q, "answer", None):
             #     user_selected_id = getattr(q.answer, "selected_option_id", None)
 
-            # Find the correct option id for the MCQ (if any)
-            correct_option_id = None
-            for o in q.mcq.options:
-                if getattr(o, "is_correct", False):
-                    correct_option_id = o.id
-                    break
-
-            # Build OptionSchema list and mark selected + include is_correct
-            options = []
-            for o in q.mcq.options:
-                opt = {
-                    "id": o.id,
-                    "option_text": o.option_text,
-                    "is_correct": bool(getattr(o, "is_correct", False))
-                    # "selected": (user_selected_id == o.id),
-                }
-                options.append(opt)
+            mcq = q.mcq
+
+            # Correct option id is loaded with the MCQ row (see get_session_questions)
+            correct_option_id = mcq.correct_option_id
+
+            # Options come straight from the DB, so build the schemas without validation
+            options = [
+                OptionSchema.model_construct(
+                    id=o.id,
+                    option_text=o.option_text,
+                    is_correct=bool(o.is_correct),
+                    # selected=(user_selected_id == o.id),
+                )
+                for o in mcq.options
+            ]
 
             response.append(
-                QuestionResponse(
-                    mcq_id=q.mcq.id,
-                    question_text=q.mcq.question_text,
+                QuestionResponse.model_construct(
+                    mcq_id=mcq.id,
+                    question_text=mcq.question_text,
                     options=options,
                     answered_option_id=correct_option_id,
                     order_index=q.order_index,
@@ -117,13 +120,13 @@ def get_questions(
             )
         return response
     except ValueError as e:
-        logger.warning(
-            f"Validation error fetching questions for session {session_id}: {e}"
-        )
+        logger.warning("Validation error fetching questions for session %s: %s", session_id, e)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(
-            f"Unexpected error fetching questions for session {session_id}: {e}",
+            "Unexpected error fetching questions for session %s: %s",
+            session_id,
+            e,
             exc_info=True,
         )
         raise HTTPException(
@@ -155,11 +158,13 @@ def save_answer(
         )
         return {"message": "Answer saved successfully"}
     except ValueError as e:
-        logger.warning(f"Validation error saving answer for session {session_id}: {e}")
+        logger.warning("Validation error saving answer for session %s: %s", session_id, e)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(
-            f"Unexpected error saving answer for session {session_id}: {e}",
+            "Unexpected error saving answer for session %s: %s",
+            session_id,
+            e,
             exc_info=True,
         )
         raise HTTPException(
@@ -182,16 +187,14 @@ def submit_session(
     """
     try:
         user_id = current_user.get("user_id")
-        logger.info(f"User {user_id} submitting session {session_id}")
+        logger.info("User %s submitting session %s", user_id, session_id)
         result = service.submit(session_id, user_id)
         return result
     except ValueError as e:
-        logger.warning(f"Validation error submitting session {session_id}: {e}")
+        logger.warning("Validation error submitting session %s: %s", session_id, e)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
-        logger.error(
-            f"Unexpected error submitting session {session_id}: {e}", exc_info=True
-        )
+        logger.error("Unexpected error submitting session %s: %s", session_id, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred.",
@@ -212,20 +215,21 @@ def get_result(
     Retrieves the result of a previously submitted session.
     """
     user_id = current_user.get("user_id")
-    session = service.repo.get_session_by_id(db, session_id)
+    # Ownership is part of the lookup, so a foreign session reads as missing
+    session = service.repo.get_user_session_state(db, session_id, user_id)
 
-    if not session or session.user_id != user_id:
+    if session is None:
         logger.warning(
-            f"Result lookup failed: Session {session_id} not found or unauthorized for user {user_id}"
+            "Result lookup failed: Session %s not found or unauthorized for user %s",
+            session_id,
+            user_id,
         )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Session not found"
         )
 
     if not session.is_submitted:
-        logger.warning(
-            f"Result lookup failed: Session {session_id} is not yet submitted"
-        )
+        logger.warning("Result lookup failed: Session %s is not yet submitted", session_id)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Session not yet submitted"
         )
@@ -235,7 +239,9 @@ def get_result(
         return result
     except Exception as e:
         logger.error(
-            f"Unexpected error evaluating result for session {session_id}: {e}",
+            "Unexpected error evaluating result for session %s: %s",
+            session_id,
+            e,
             exc_info=True,
         )
         raise HTTPException(
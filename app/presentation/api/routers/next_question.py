@@ -1,9 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from typing import Dict
+from typing import Dict, Optional, Tuple
 import asyncio
 import logging
 
-from app.infrastructure.adaptive_system.adaptive_engine import AdaptiveLearningEngine
+from app.infrastructure.adaptive_system.adaptive_engine import (
+    AdaptiveLearningEngine,
+    SessionAccessDenied,
+    SessionNotFound,
+)
 from app.presentation.schemas.adaptive_schemas import (
     NextQuestionRequest,
     NextQuestionResponse,
@@ -13,11 +17,64 @@ from app.presentation.schemas.adaptive_schemas import (
     LearningSessionCreate,
     LearningSessionSchema,
 )
-from app.presentation.dependencies import get_current_user, get_adaptive_engine
+from app.presentation.dependencies import (
+    get_current_user,
+    get_adaptive_engine,
+    build_adaptive_engine,
+)
+from app.infrastructure.db.session import SessionLocal
 
 router = APIRouter(prefix="/learning", tags=["Adaptive Learning"])
 logger = logging.getLogger(__name__)
 
+# Next questions generated in the background right after a submission,
+# keyed by session id, so /next-question can skip the LLM round trip.
+# Each entry keeps the user whose verified submission scheduled it.
+# Only touched from the event loop, so no lock is needed.
+_prefetched: Dict[int, Tuple[int, asyncio.Task]] = {}
+MAX_PREFETCHED = 1024
+
+
+def _generate_next_question(user_id: int, session_id: int) -> Dict:
+    # Runs in a worker thread after the request's session is closed
+    db = SessionLocal()
+    try:
+        return build_adaptive_engine(db).get_next_question_for_session(user_id, session_id)
+    finally:
+        db.close()
+
+
+def _log_prefetch_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Question prefetch failed: %s", task.exception())
+
+
+def _schedule_prefetch(session_id: int, user_id: int) -> None:
+    _discard_prefetch(session_id)
+    # Abandoned sessions never collect theirs; drop the oldest
+    while len(_prefetched) >= MAX_PREFETCHED:
+        _discard_prefetch(next(iter(_prefetched)))
+
+    task = asyncio.create_task(
+        asyncio.to_thread(_generate_next_question, user_id, session_id)
+    )
+    task.add_done_callback(_log_prefetch_failure)
+    _prefetched[session_id] = (user_id, task)
+
+
+def _take_prefetch(session_id: int, user_id: int) -> Optional[asyncio.Task]:
+    entry = _prefetched.get(session_id)
+    if entry is None or entry[0] != user_id:
+        return None
+    del _prefetched[session_id]
+    return entry[1]
+
+
+def _discard_prefetch(session_id: int) -> None:
+    entry = _prefetched.pop(session_id, None)
+    if entry is not None:
+        entry[1].cancel()
+
 
 @router.post(
     "/start-session",
@@ -34,7 +91,9 @@ async def start_session(
     """
     user_id = current_user["user_id"]
     try:
-        session = engine.start_session(
+        # Engine calls are blocking DB (and LLM) work; run them off the event loop
+        session = await asyncio.to_thread(
+            engine.start_session,
             user_id=user_id,
             subject_id=request.subject_id,
             topic_id=request.topic_id
@@ -68,42 +127,31 @@ async def get_next_question(
     )
 
     try:
-        # Fetch session to get topic_id and verify ownership
-        logger.debug(f"Fetching session_id={request.session_id} for verification")
-        session_repo = engine._sessions
-        session = session_repo.get_session_by_id(request.session_id)
-
-        if not session:
-            logger.warning(f"Session not found: session_id={request.session_id}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Session {request.session_id} not found",
-            )
-
-        # Verify session belongs to current user
-        if session.user_id != user_id:
-            logger.warning(
-                f"Session ownership mismatch: session_id={request.session_id}, "
-                f"session.user_id={session.user_id}, current_user_id={user_id}"
-            )
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Session does not belong to current user",
-            )
-
-        logger.info(
-            f"Session verified: session_id={request.session_id}, topic_id={session.topic_id}"
-        )
-
-        # Get next question for this session's topic with 20-second timeout
+        # Use the question prefetched after this user's last submission when
+        # there is one; otherwise generate it now, with the engine checking
+        # session ownership. Either way with a 20-second timeout
+        question = None
+        prefetched = _take_prefetch(request.session_id, user_id)
         try:
-            logger.debug(
-                f"Starting question generation for user_id={user_id}, topic_id={session.topic_id}"
-            )
-            question = await asyncio.wait_for(
-                asyncio.to_thread(engine.get_next_question, user_id, session.topic_id),
-                timeout=20.0
-            )
+            if prefetched is not None:
+                try:
+                    question = await asyncio.wait_for(prefetched, timeout=20.0)
+                    logger.debug("Using prefetched question for session_id=%s", request.session_id)
+                except asyncio.TimeoutError:
+                    raise
+                except Exception as e:
+                    logger.warning("Discarding failed prefetch for session_id=%s: %s", request.session_id, e)
+
+            if question is None:
+                logger.debug(
+                    f"Starting question generation for user_id={user_id}, session_id={request.session_id}"
+                )
+                question = await asyncio.wait_for(
+                    asyncio.to_thread(
+                        engine.get_next_question_for_session, user_id, request.session_id
+                    ),
+                    timeout=20.0
+                )
             logger.info(
                 f"Question generation successful: question_id={question.get('question_id')}, "
                 f"template_id={question.get('template_id')}"
@@ -111,7 +159,7 @@ async def get_next_question(
         except asyncio.TimeoutError:
             logger.error(
                 f"Question generation timeout (20s exceeded) for user_id={user_id}, "
-                f"session_id={request.session_id}, topic_id={session.topic_id}"
+                f"session_id={request.session_id}"
             )
             raise HTTPException(
                 status_code=status.HTTP_504_GATEWAY_TIMEOUT,
@@ -143,6 +191,10 @@ async def get_next_question(
 
     except HTTPException:
         raise
+    except SessionNotFound as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except SessionAccessDenied as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
     except ValueError as e:
         logger.warning(
             f"Invalid state for next question: {e}",
@@ -179,23 +231,9 @@ async def submit_response(
     user_id = current_user["user_id"]
 
     try:
-        # Verify session belongs to current user
-        session_repo = engine._sessions
-        session = session_repo.get_session_by_id(payload.session_id)
-        
-        if not session:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Session {payload.session_id} not found"
-            )
-        
-        if session.user_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Session does not belong to current user"
-            )
-        
-        feedback = engine.process_response(
+        # The engine verifies the session belongs to the current user
+        feedback = await asyncio.to_thread(
+            engine.process_response,
             user_id=user_id,
             question_id=payload.question_id,
             template_id=payload.template_id,
@@ -215,6 +253,9 @@ async def submit_response(
             },
         )
 
+        # Generate the next question while the user reads the feedback
+        _schedule_prefetch(payload.session_id, user_id)
+
         return SubmissionResult(
             correct=feedback["correct"],
             correct_option_index=feedback["correct_option_index"],
@@ -230,6 +271,10 @@ async def submit_response(
 
     except HTTPException:
         raise
+    except SessionNotFound as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except SessionAccessDenied as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
 
     except ValueError as e:
         logger.warning("Invalid response submission", exc_info=e)
@@ -261,27 +306,15 @@ async def end_session(
     user_id = current_user["user_id"]
 
     try:
-        # Verify session exists and belongs to the current user
-        session_repo = engine._sessions
-        session = session_repo.get_session_by_id(session_id)
-
-        if not session:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Session {session_id} not found",
-            )
-
-        if session.user_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Session does not belong to current user",
-            )
-
-        session_data = engine.end_session(session_id)
+        # Only ends the session if it belongs to the current user
+        session_data = await asyncio.to_thread(engine.end_session, session_id, user_id)
+        _discard_prefetch(session_id)
         return LearningSessionSchema(**session_data)
 
     except HTTPException:
         raise
+    except SessionAccessDenied as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from presentation.schemas.topic_schema import TopicCreate, TopicOut
+from presentation.schemas.topic_schema import TopicCreate, TopicOut, TopicWithCountOut
 from infrastructure.db.models.topic_model import Topic
 from presentation.dependencies import get_db, admin_required
 from infrastructure.repositories.topic_repo_impl import (
     create_topic,
     get_topics_by_subject,
+    get_topics_with_counts,
     get_all_topics,
     get_topic_by_id,
     update_topic,
@@ -68,6 +69,17 @@ def list_topics(
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+@router.get("/with-counts", response_model=list[TopicWithCountOut])
+def list_topics_with_counts(subject_id: int, db: Session = Depends(get_db)):
+    """Get a subject's topics with the number of MCQs in each"""
+    try:
+        logger.info("Fetching topics with MCQ counts for subject_id: %s", subject_id)
+        return get_topics_with_counts(db, subject_id)
+    except Exception as e:
+        logger.error("Error fetching topics with counts: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
 @router.get("/{topic_id}", response_model=TopicOut)
 def get_topic(
     topic_id: int, db: Session = Depends(get_db)
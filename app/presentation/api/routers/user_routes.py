@@ -24,15 +24,7 @@ def list_mock_tests(
 ):
     try:
         logger.info(f"User {user['user_id']} fetching all mock tests")
-        tests = db.query(MockTestModel).all()
-        return [
-            MockTestOut(
-                id=t.id,
-                title=t.title,
-                total_questions=len(t.questions),
-            )
-            for t in tests
-        ]
+        return MockTestRepository(db).list_mock_tests()
     except Exception as e:
         logger.error(f"Error fetching mock tests: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal Server Error")
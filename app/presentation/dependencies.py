@@ -1,11 +1,13 @@
-from app.infrastructure.db.session import SessionLocal
+from app.infrastructure.db.session import SessionLocal, ScopedSession, request_scope
 from fastapi import Depends, HTTPException, status
+from starlette.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 import os
 from app.infrastructure.security.jwt_service import decode_access_token
 import logging
 from app.infrastructure.db.models.user_model import UserModel
 from sqlalchemy.orm import Session
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
@@ -14,12 +16,44 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 # oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
+class DBSessionMiddleware:
+    """
+    Opens a request scope for ScopedSession and removes the request's session
+    once the response has been sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = request_scope.set(object())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # close() may roll back on the connection; keep it off the loop
+            await run_in_threadpool(ScopedSession.remove)
+            request_scope.reset(token)
+
+
 def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+    if request_scope.get() is None:
+        # Outside a request (scripts, background work): a private session
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+        return
+
+    # Every dependency in the request shares this session, including routers
+    # that import this module as presentation.dependencies: both copies take
+    # request_scope/ScopedSession from app.infrastructure.db.session.
+    # DBSessionMiddleware closes it
+    yield ScopedSession()
 
 
 # def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
@@ -113,7 +147,43 @@ def admin_required(current_user: dict = Depends(get_current_user)) -> dict:
     return current_user
 
 
+@lru_cache(maxsize=1)
+def get_prompt_cache():
+    """Process-wide semantic cache shared by the per-request question generators."""
+    from app.infrastructure.adaptive_system.prompt_cache import SemanticPromptCache
+
+    return SemanticPromptCache()
+
+
+@lru_cache(maxsize=4)
+def get_llm_client(hf_token: str):
+    """
+    Process-wide LLM client, so the endpoint's HTTP clients and their pooled
+    connections are reused across requests instead of rebuilt per request.
+    """
+    from app.infrastructure.adaptive_system.huggingface_client import (
+        HuggingFaceChatClient,
+    )
+
+    return HuggingFaceChatClient(
+        repo_id="mistralai/Mistral-7B-Instruct-v0.2",
+        task="text-generation",
+        max_new_tokens=512,
+        do_sample=False,
+        repetition_penalty=1.03,
+        huggingfacehub_api_token=hf_token,
+    )
+
+
 def get_adaptive_engine(db: SessionLocal = Depends(get_db)):
+    return build_adaptive_engine(db)
+
+
+def build_adaptive_engine(db: Session):
+    """
+    Wires an AdaptiveLearningEngine around the given session. Used directly
+    by work that runs outside a request and owns its own session.
+    """
     from app.infrastructure.repositories.user_repository import UserRepository
     from app.infrastructure.repositories.question_repository import QuestionRepository
     from app.infrastructure.repositories.response_repository import ResponseRepository
@@ -131,9 +201,6 @@ def get_adaptive_engine(db: SessionLocal = Depends(get_db)):
     from app.infrastructure.adaptive_system.question_generation import (
         LLMQuestionGenerator,
     )
-    from app.infrastructure.adaptive_system.huggingface_client import (
-        HuggingFaceChatClient,
-    )
     from dotenv import load_dotenv
 
     load_dotenv()
@@ -146,15 +213,8 @@ def get_adaptive_engine(db: SessionLocal = Depends(get_db)):
     llm_gen = None
     hf_token = os.getenv("HF_TOKEN")
     if hf_token:
-        llm_client = HuggingFaceChatClient(
-            repo_id="mistralai/Mistral-7B-Instruct-v0.2",
-            task="text-generation",
-            max_new_tokens=512,
-            do_sample=False,
-            repetition_penalty=1.03,
-            huggingfacehub_api_token=hf_token,
-        )
-        llm_gen = LLMQuestionGenerator(llm_client)
+        llm_client = get_llm_client(hf_token)
+        llm_gen = LLMQuestionGenerator(llm_client, prompt_cache=get_prompt_cache())
 
     user_repo = UserRepository(db)
     question_repo = QuestionRepository(db)
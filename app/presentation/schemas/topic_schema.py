@@ -25,3 +25,7 @@ class TopicOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class TopicWithCountOut(TopicOut):
+    mcq_count: int = 0
@@ -27,6 +27,7 @@ from app.presentation.api.routers import (
 
 
 from app.infrastructure.db.init_db import init_db
+from app.presentation.dependencies import DBSessionMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 
 
@@ -49,6 +50,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(DBSessionMiddleware)
 
 # Serve files from 'uploads' folder at /uploads path
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")